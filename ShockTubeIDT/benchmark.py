@@ -0,0 +1,217 @@
+"""
+Copyright 2021 Mark E. Fuller
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Benchmarks and regression checks on the mechanisms bundled with Cantera.
+
+    python -m ShockTubeIDT.benchmark --save     # record a baseline
+    python -m ShockTubeIDT.benchmark            # compare against it
+
+The exit status is 1 if a scenario got slower, used more memory or its IDTs
+drifted beyond the tolerances.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cantera as ct
+import numpy as np
+
+from .ignition_delay import ignition_delay, idt_sweep_T, idt_sweep_TM, idt_sweep_TP, idt_sweep_TX
+from .instrument import Profiler
+from .mechanism_cache import get_solution
+
+H2 = "H2:0.04,O2:0.02,AR:0.94"
+CH4 = "CH4:0.01,O2:0.02,AR:0.97"
+COUNTERS = ("steps", "rhs_evals", "jac_evals")
+
+
+def _point(mech, T, P, X):
+    def run(profile):
+        gas = get_solution(mech)
+        gas.TPX = T, P, X
+        return [ignition_delay(gas, profile=profile)]
+    return run
+
+
+def _sweep_T(profile):
+    return idt_sweep_T(get_solution("h2o2.yaml"), np.linspace(900, 1400, 11), ct.one_atm, H2,
+                       profile=profile)
+
+
+def _sweep_TP(profile):
+    return idt_sweep_TP(get_solution("h2o2.yaml"), np.linspace(1000, 1400, 6),
+                        [1e5, 1e6, 4e6], H2, profile=profile)
+
+
+def _sweep_TX(profile):
+    return idt_sweep_TX(get_solution("gri30.yaml"), np.linspace(1500, 1800, 4), 10 * ct.one_atm,
+                        [CH4, "CH4:0.01,O2:0.01,AR:0.98"], profile=profile)
+
+
+def _sweep_TM(profile):
+    return idt_sweep_TM(["h2o2.yaml", "gri30.yaml"], np.linspace(1000, 1400, 5), ct.one_atm, H2,
+                        profile=profile)
+
+
+def _plot(profile):
+    from .idt_plots import comp_mix_mech
+
+    temps = np.linspace(1000, 1400, 5)
+    IDTs = idt_sweep_TM(["h2o2.yaml", "gri30.yaml"], temps, ct.one_atm, H2, profile=profile)
+    with tempfile.TemporaryDirectory() as tmp:
+        comp_mix_mech([H2], ["h2o2", "gri30"], temps, IDTs[np.newaxis],
+                      os.path.join(tmp, "comp.png"))
+    return IDTs
+
+
+SCENARIOS = {
+    "ignition_delay/h2o2": _point("h2o2.yaml", 1000.0, ct.one_atm, H2),
+    "ignition_delay/gri30": _point("gri30.yaml", 1600.0, 10 * ct.one_atm, CH4),
+    "idt_sweep_T/h2o2": _sweep_T,
+    "idt_sweep_TP/h2o2": _sweep_TP,
+    "idt_sweep_TX/gri30": _sweep_TX,
+    "idt_sweep_TM/h2o2+gri30": _sweep_TM,
+    "comp_mix_mech/h2o2+gri30": _plot,
+}
+
+
+def _measure(name, repeat):
+    """
+    Record of one scenario, measured in the calling process.
+    """
+    func = SCENARIOS[name]
+    # warm up the mechanism cache so parsing is not timed
+    func(None)
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        taus = func(None)
+        best = min(best, time.perf_counter() - start)
+
+    # counters come from a separate, profiled run
+    profile = Profiler()
+    func(profile)
+    stats = profile.summary()
+
+    # peak resident size, including Cantera's own allocations
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    record = {"seconds": best,
+              "max_rss": rss if sys.platform == "darwin" else rss * 1024,
+              "tau": np.asarray(taus, dtype=float).ravel().tolist()}
+    record.update({k: stats.get(k) for k in COUNTERS})
+    return record
+
+
+def run_scenario(name, repeat=3):
+    """
+    Best wall time and IDTs of `repeat` runs of a scenario, solver counters
+    of a profiled run (see instrument.Profiler) and max_rss, the peak
+    resident memory. Each scenario runs in a fresh process, so max_rss
+    belongs to that scenario alone.
+    """
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(_measure, name, repeat).result()
+
+
+def environment():
+    return {"cantera": ct.__version__, "numpy": np.__version__,
+            "python": platform.python_version(), "machine": platform.machine()}
+
+
+def compare(results, baseline, slowdown=0.25, tauTol=1e-3, memory=0.25):
+    """
+    Regressions against a baseline: scenarios more than `slowdown` slower,
+    with a peak resident memory more than `memory` larger, or with any IDT
+    differing by more than a relative tauTol (including a change in which
+    points ignite). Returns a list of messages.
+    """
+    problems = []
+    for name, rec in results.items():
+        ref = baseline.get(name)
+        if ref is None:
+            continue
+        ratio = rec["seconds"] / ref["seconds"]
+        if ratio > 1.0 + slowdown:
+            problems.append(f"{name}: {ratio:.2f}x slower ({rec['seconds']:.3g} s)")
+        if ref.get("max_rss"):
+            growth = rec["max_rss"] / ref["max_rss"]
+            if growth > 1.0 + memory:
+                problems.append(f"{name}: {growth:.2f}x memory "
+                                f"({rec['max_rss'] / 2**20:.1f} MiB)")
+        tau = np.array(rec["tau"], dtype=float)
+        tau0 = np.array(ref["tau"], dtype=float)
+        if tau.shape != tau0.shape or np.any(np.isnan(tau) != np.isnan(tau0)):
+            problems.append(f"{name}: ignited points changed")
+            continue
+        drift = np.nanmax(np.abs(tau / tau0 - 1.0), initial=0.0)
+        if drift > tauTol:
+            problems.append(f"{name}: IDT drift {drift:.2e}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ShockTubeIDT.benchmark",
+                                     description="IDT benchmarks and regression checks")
+    parser.add_argument("--baseline", default="benchmark_baseline.json")
+    parser.add_argument("--save", action="store_true", help="write results as the baseline")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--slowdown", type=float, default=0.25,
+                        help="tolerated relative slowdown")
+    parser.add_argument("--tau-tol", type=float, default=1e-3,
+                        help="tolerated relative IDT drift")
+    parser.add_argument("--memory", type=float, default=0.25,
+                        help="tolerated relative growth of peak memory")
+    parser.add_argument("-k", default="", help="only scenarios containing this text")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["scenarios"]
+
+    results = {}
+    for name in SCENARIOS:
+        if args.k not in name:
+            continue
+        rec = run_scenario(name, args.repeat)
+        results[name] = rec
+        ref = baseline.get(name)
+        change = f"  ({rec['seconds'] / ref['seconds']:.2f}x)" if ref else ""
+        print(f"{name:28s} {rec['seconds']:9.4f} s {rec['max_rss'] / 2**20:8.1f} MiB"
+              f"  steps {rec['steps'] or '-'}{change}")
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({"environment": environment(), "scenarios": results}, f, indent=1)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    problems = compare(results, baseline, args.slowdown, args.tau_tol, args.memory)
+    for p in problems:
+        print("REGRESSION", p)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""
+Copyright 2021 Mark E. Fuller
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Declarative IDT campaigns. A campaign file (TOML or YAML) lists sweeps of
+mechanisms, mixtures and T/P grids, the ignition_delay settings shared by
+all of them and the figures to draw, e.g.
+
+    [campaign]
+    output = "results"
+
+    [settings]
+    endTime = 0.1
+    definitions = ["dPdt", "OH"]
+
+    [[sweep]]
+    name = "h2"
+    mechanisms = ["h2o2.yaml", "gri30.yaml"]
+    mixtures = ["H2:0.04,O2:0.02,AR:0.94"]
+    T = {start = 900, stop = 1400, num = 11, spacing = "inverse"}
+    P = [1e5, 1e6]
+    plots = ["comp_mech"]
+
+Run it with `shocktubeidt campaign.toml -j 8`.
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from . import idt_plots
+from .checkpoint import mixture_key
+from .ignition_delay import ignition_delay
+from .parallel import run_curves
+from .results import IDTResult
+from .scheduling import CostModel
+
+PLOTS = ("comp_mix_mech", "comp_mix", "comp_mech", "comp_mech_data")
+
+
+def load_campaign(path):
+    """
+    Read a campaign from a .toml, .yaml or .yml file.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".toml":
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            import tomli as tomllib
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    if ext in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("Reading YAML campaigns requires PyYAML") from None
+        with open(path) as f:
+            return yaml.safe_load(f)
+    raise ValueError(f"Unknown campaign format {ext!r}; use .toml or .yaml")
+
+
+def grid(spec):
+    """
+    Values of a grid given as a list, a single number or a table with
+    start, stop and either num or step. spacing = "inverse" spaces num
+    temperatures evenly in 1000/T.
+    """
+    if isinstance(spec, dict):
+        start, stop = float(spec["start"]), float(spec["stop"])
+        if "step" in spec:
+            step = float(spec["step"])
+            return np.arange(start, stop + 0.5 * step, step)
+        if spec.get("spacing") == "inverse":
+            return 1000.0 / np.linspace(1000.0 / start, 1000.0 / stop, int(spec["num"]))
+        return np.linspace(start, stop, int(spec["num"]))
+    return np.atleast_1d(np.asarray(spec, dtype=float))
+
+
+def expand_campaign(campaign):
+    """
+    Expand the sweeps of a campaign into one list of distinct points.
+
+    Returns (points, sweeps): points is a list of (mech, P, X, T) with points
+    shared by several sweeps listed once; each sweep is a dict with its
+    name, coords (P, X, M, T) and index, an integer array of shape
+    (P, X, M, T) into points.
+    """
+    points = []
+    where = {}
+    sweeps = []
+    for n, spec in enumerate(campaign.get("sweep", [])):
+        mechs = spec["mechanisms"]
+        mechs = [mechs] if isinstance(mechs, str) else list(mechs)
+        mixes = spec["mixtures"]
+        mixes = [mixes] if isinstance(mixes, (str, dict)) else list(mixes)
+        Prange = grid(spec["P"])
+        Trange = grid(spec["T"])
+        index = np.empty((len(Prange), len(mixes), len(mechs), len(Trange)), dtype=int)
+        for i, P in enumerate(Prange):
+            for j, X in enumerate(mixes):
+                for k, M in enumerate(mechs):
+                    for q, T in enumerate(Trange):
+                        key = (M, float(P), mixture_key(X), float(T))
+                        if key not in where:
+                            where[key] = len(points)
+                            points.append((M, float(P), X, float(T)))
+                        index[i, j, k, q] = where[key]
+        sweeps.append({
+            "name": spec.get("name", f"sweep{n}"),
+            "coords": {"P": Prange, "X": mixes, "M": mechs, "T": Trange},
+            "index": index,
+            "plots": spec.get("plots", []),
+            "labels": spec.get("labels", mechs),
+        })
+    return points, sweeps
+
+
+def run_campaign(campaign, output=None, max_workers=None, fresh=False):
+    """
+    Run a campaign (a dict or the path of a campaign file).
+
+    Distinct points are integrated once, most expensive first, and handed
+    to idle workers one at a time (see scheduling.CostModel); point timings
+    are kept in timings.json in the output directory, or in the file given
+    as timings under [campaign], to improve the predictions of later runs.
+    Completed points are logged to points.jsonl in the output directory by
+    mechanism contents, P, X, T and settings, so an interrupted campaign
+    resumes where it stopped and an edited one only runs its new points;
+    fresh=True discards the log and runs every point again. Writes points.csv with
+    every point, one results.IDTResult directory per sweep and the
+    requested figures.
+
+    Returns {sweep name: IDTResult}.
+    """
+    if isinstance(campaign, str):
+        campaign = load_campaign(campaign)
+    options = campaign.get("campaign", {})
+    settings = dict(campaign.get("settings", {}))
+    output = output or options.get("output", "results")
+    if max_workers is None:
+        max_workers = options.get("max_workers")
+    os.makedirs(output, exist_ok=True)
+    log = os.path.join(output, "points.jsonl")
+    if fresh and os.path.exists(log):
+        os.remove(log)
+
+    points, sweeps = expand_campaign(campaign)
+    curves = [p[:3] for p in points]
+    temps = np.array([p[3] for p in points]).reshape(-1, 1)
+    schedule = CostModel(options.get("timings", os.path.join(output, "timings.json")))
+
+    values, seconds = run_curves(ignition_delay, curves, temps, max_workers,
+                                 return_times=True, schedule=schedule,
+                                 checkpoint=log,
+                                 **settings)
+    IgnDelays = values[:, 0]
+    solveTimes = seconds[:, 0]
+
+    table = pd.DataFrame({
+        "mechanism": [p[0] for p in points],
+        "P": [p[1] for p in points],
+        "X": [str(p[2]) for p in points],
+        "T": [p[3] for p in points],
+    })
+    if IgnDelays.dtype.names is None:
+        table["tau"] = IgnDelays
+    else:
+        for name in IgnDelays.dtype.names:
+            table[name] = IgnDelays[name]
+    table["seconds"] = solveTimes
+    table.to_csv(os.path.join(output, "points.csv"), index=False)
+
+    results = {}
+    for sweep in sweeps:
+        coords = dict(sweep["coords"])
+        coords["X"] = [str(X) for X in coords["X"]]
+        result = IDTResult(IgnDelays[sweep["index"]], "PXMT", coords,
+                           solveTimes[sweep["index"]])
+        folder = os.path.join(output, sweep["name"])
+        result.save(folder)
+        results[sweep["name"]] = result
+        _plot_sweep(result, sweep, folder, max_workers)
+    return results
+
+
+def _plot_sweep(result, sweep, folder, max_workers):
+    """
+    Requested figures of a sweep, one set per pressure and IDT definition;
+    unchanged figures are not redrawn.
+    """
+    fields = result.fields or (None,)
+    for plot in sweep["plots"]:
+        if plot not in PLOTS:
+            raise ValueError(f"Unknown plot {plot!r}; use one of {PLOTS}")
+        func = getattr(idt_plots, plot)
+        for i in range(result.shape[0]):
+            for field in fields:
+                values = result.values[i] if field is None else result.values[field][i]
+                tag = f"P{i}" if field is None else f"P{i}-{field}"
+                ofname = os.path.join(folder, f"{plot}-{tag}.png")
+                extra = {} if plot == "comp_mix_mech" else {"max_workers": max_workers}
+                func(sweep["coords"]["X"], sweep["labels"], result.coords["T"], values,
+                     ofname, incremental=True, **extra)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="shocktubeidt",
+                                     description="Run an IDT campaign file")
+    parser.add_argument("campaign", help="campaign file (.toml or .yaml)")
+    parser.add_argument("-o", "--output", help="output directory")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: campaign setting or all cores)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="only report the number of points")
+    parser.add_argument("--fresh", action="store_true",
+                        help="recompute points already logged by earlier runs")
+    args = parser.parse_args(argv)
+
+    campaign = load_campaign(args.campaign)
+    if args.dry_run:
+        points, sweeps = expand_campaign(campaign)
+        total = sum(s["index"].size for s in sweeps)
+        print(f"{len(sweeps)} sweeps, {total} points, {len(points)} distinct")
+        return 0
+
+    results = run_campaign(campaign, args.output, args.workers, args.fresh)
+    for name, result in results.items():
+        ignited = np.mean(result.ignited)
+        print(f"{name}: {result.values.size} points, {ignited:.0%} ignited, "
+              f"{np.nansum(result.solve_time):.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Copyright 2021 Mark E. Fuller
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from .result_cache import mechanism_hash
+
+# settings that do not change results or cannot be serialized stably
+_IGNORED = ("engine", "cache", "profile", "horizon", "historyFile", "historySpecies",
+            "historyInterval")
+
+
+def mixture_key(X):
+    """
+    Canonical text of a mixture, so that the same mixture written with its
+    species in another order gives the same key.
+    """
+    if isinstance(X, dict):
+        return json.dumps({k: float(v) for k, v in X.items()}, sort_keys=True)
+    return ",".join(sorted(p.strip() for p in str(X).split(",")))
+
+
+def point_keys(specs, Trange, kwargs, multipliers=None):
+    """
+    Hash identifying each point of a sweep by its mechanism contents,
+    pressure, mixture, temperature and IDT settings, as an array of shape
+    (len(specs), number of temperatures).
+
+    multipliers holds the non-unit rate multipliers {reaction index:
+    multiplier} of each spec (None for none), so a sweep on a modified
+    mechanism does not reuse the points of the unmodified one.
+    """
+    settings = {k: v for k, v in kwargs.items() if k not in _IGNORED}
+    for k, v in settings.items():
+        if callable(v):
+            raise ValueError(f"Cannot checkpoint a sweep with a callable {k}; "
+                             "pass it as data, e.g. pressureProfile=(times, ratios)")
+    Tgrid = np.asarray(Trange, dtype=float)
+    if Tgrid.ndim == 1:
+        Tgrid = np.broadcast_to(Tgrid, (len(specs), len(Tgrid)))
+    if multipliers is None:
+        multipliers = [None] * len(specs)
+    keys = np.empty(Tgrid.shape, dtype=object)
+    for c, ((mech, name), P, X) in enumerate(specs):
+        rates = sorted((int(i), float(m)) for i, m in (multipliers[c] or {}).items())
+        for q, T in enumerate(Tgrid[c]):
+            record = {
+                "mechanism": mechanism_hash(mech, name),
+                "multipliers": rates,
+                "P": float(f"{P:.12g}"),
+                "X": mixture_key(X),
+                "T": float(f"{T:.12g}"),
+                "settings": settings,
+            }
+            text = json.dumps(record, sort_keys=True, default=repr)
+            keys[c, q] = hashlib.sha256(text.encode()).hexdigest()
+    return keys
+
+
+class Checkpoint:
+    """
+    Append-only log of completed sweep points, one JSON line per point.
+
+    Points are identified by their key (see point_keys), so a log can be
+    shared by sweeps that overlap: an edited sweep reuses every point it
+    has in common with earlier runs. A line cut short by a crash is ignored,
+    so a sweep can always be resumed from the points that were written.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._read()
+            self._file = open(path, "a")
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # terminate a line cut short so the next record stays intact
+                    self._file.write("\n")
+        else:
+            self._file = open(path, "w")
+
+    def _read(self):
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    # incomplete last line after a crash
+                    continue
+                if "k" in rec:
+                    self.done[rec["k"]] = (rec["v"], rec["t"])
+
+    def write(self, key, value, seconds):
+        """
+        Record the point with this key; flushed so it survives a killed process.
+        """
+        self._file.write(json.dumps({"k": key, "v": value, "t": seconds}) + "\n")
+        self._file.flush()
+        self.done[key] = (value, seconds)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -35,261 +35,265 @@ ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
 SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
-cividis_map = [
-    "#00204c",
-    "#00204e",
-    "#002150",
-    "#002251",
-    "#002353",
-    "#002355",
-    "#002456",
-    "#002558",
-    "#00265a",
-    "#00265b",
-    "#00275d",
-    "#00285f",
-    "#002861",
-    "#002963",
-    "#002a64",
-    "#002a66",
-    "#002b68",
-    "#002c6a",
-    "#002d6c",
-    "#002d6d",
-    "#002e6e",
-    "#002e6f",
-    "#002f6f",
-    "#002f6f",
-    "#00306f",
-    "#00316f",
-    "#00316f",
-    "#00326e",
-    "#00336e",
-    "#00346e",
-    "#00346e",
-    "#01356e",
-    "#06366e",
-    "#0a376d",
-    "#0e376d",
-    "#12386d",
-    "#15396d",
-    "#17396d",
-    "#1a3a6c",
-    "#1c3b6c",
-    "#1e3c6c",
-    "#203c6c",
-    "#223d6c",
-    "#243e6c",
-    "#263e6c",
-    "#273f6c",
-    "#29406b",
-    "#2b416b",
-    "#2c416b",
-    "#2e426b",
-    "#2f436b",
-    "#31446b",
-    "#32446b",
-    "#33456b",
-    "#35466b",
-    "#36466b",
-    "#37476b",
-    "#38486b",
-    "#3a496b",
-    "#3b496b",
-    "#3c4a6b",
-    "#3d4b6b",
-    "#3e4b6b",
-    "#404c6b",
-    "#414d6b",
-    "#424e6b",
-    "#434e6b",
-    "#444f6b",
-    "#45506b",
-    "#46506b",
-    "#47516b",
-    "#48526b",
-    "#49536b",
-    "#4a536b",
-    "#4b546b",
-    "#4c556b",
-    "#4d556b",
-    "#4e566b",
-    "#4f576c",
-    "#50586c",
-    "#51586c",
-    "#52596c",
-    "#535a6c",
-    "#545a6c",
-    "#555b6c",
-    "#565c6c",
-    "#575d6d",
-    "#585d6d",
-    "#595e6d",
-    "#5a5f6d",
-    "#5b5f6d",
-    "#5c606d",
-    "#5d616e",
-    "#5e626e",
-    "#5f626e",
-    "#5f636e",
-    "#60646e",
-    "#61656f",
-    "#62656f",
-    "#63666f",
-    "#64676f",
-    "#65676f",
-    "#666870",
-    "#676970",
-    "#686a70",
-    "#686a70",
-    "#696b71",
-    "#6a6c71",
-    "#6b6d71",
-    "#6c6d72",
-    "#6d6e72",
-    "#6e6f72",
-    "#6f6f72",
-    "#6f7073",
-    "#707173",
-    "#717273",
-    "#727274",
-    "#737374",
-    "#747475",
-    "#757575",
-    "#757575",
-    "#767676",
-    "#777776",
-    "#787876",
-    "#797877",
-    "#7a7977",
-    "#7b7a77",
-    "#7b7b78",
-    "#7c7b78",
-    "#7d7c78",
-    "#7e7d78",
-    "#7f7e78",
-    "#807e78",
-    "#817f78",
-    "#828078",
-    "#838178",
-    "#848178",
-    "#858278",
-    "#868378",
-    "#878478",
-    "#888578",
-    "#898578",
-    "#8a8678",
-    "#8b8778",
-    "#8c8878",
-    "#8d8878",
-    "#8e8978",
-    "#8f8a78",
-    "#908b78",
-    "#918c78",
-    "#928c78",
-    "#938d78",
-    "#948e78",
-    "#958f78",
-    "#968f77",
-    "#979077",
-    "#989177",
-    "#999277",
-    "#9a9377",
-    "#9b9377",
-    "#9c9477",
-    "#9d9577",
-    "#9e9676",
-    "#9f9776",
-    "#a09876",
-    "#a19876",
-    "#a29976",
-    "#a39a75",
-    "#a49b75",
-    "#a59c75",
-    "#a69c75",
-    "#a79d75",
-    "#a89e74",
-    "#a99f74",
-    "#aaa074",
-    "#aba174",
-    "#aca173",
-    "#ada273",
-    "#aea373",
-    "#afa473",
-    "#b0a572",
-    "#b1a672",
-    "#b2a672",
-    "#b4a771",
-    "#b5a871",
-    "#b6a971",
-    "#b7aa70",
-    "#b8ab70",
-    "#b9ab70",
-    "#baac6f",
-    "#bbad6f",
-    "#bcae6e",
-    "#bdaf6e",
-    "#beb06e",
-    "#bfb16d",
-    "#c0b16d",
-    "#c1b26c",
-    "#c2b36c",
-    "#c3b46c",
-    "#c5b56b",
-    "#c6b66b",
-    "#c7b76a",
-    "#c8b86a",
-    "#c9b869",
-    "#cab969",
-    "#cbba68",
-    "#ccbb68",
-    "#cdbc67",
-    "#cebd67",
-    "#d0be66",
-    "#d1bf66",
-    "#d2c065",
-    "#d3c065",
-    "#d4c164",
-    "#d5c263",
-    "#d6c363",
-    "#d7c462",
-    "#d8c561",
-    "#d9c661",
-    "#dbc760",
-    "#dcc860",
-    "#ddc95f",
-    "#deca5e",
-    "#dfcb5d",
-    "#e0cb5d",
-    "#e1cc5c",
-    "#e3cd5b",
-    "#e4ce5b",
-    "#e5cf5a",
-    "#e6d059",
-    "#e7d158",
-    "#e8d257",
-    "#e9d356",
-    "#ebd456",
-    "#ecd555",
-    "#edd654",
-    "#eed753",
-    "#efd852",
-    "#f0d951",
-    "#f1da50",
-    "#f3db4f",
-    "#f4dc4e",
-    "#f5dd4d",
-    "#f6de4c",
-    "#f7df4b",
-    "#f9e049",
-    "#fae048",
-    "#fbe147",
-    "#fce246",
-    "#fde345",
-    "#ffe443",
-    "#ffe542",
-    "#ffe642",
-    "#ffe743",
-    "#ffe844",
-    "#ffe945",
-]
\ No newline at end of file
+import numpy as np
+
+# 8-bit RGB entries of the cividis hex values, converted once to floats in [0, 1]
+cividis_map = np.array([
+    [  0,  32,  76],
+    [  0,  32,  78],
+    [  0,  33,  80],
+    [  0,  34,  81],
+    [  0,  35,  83],
+    [  0,  35,  85],
+    [  0,  36,  86],
+    [  0,  37,  88],
+    [  0,  38,  90],
+    [  0,  38,  91],
+    [  0,  39,  93],
+    [  0,  40,  95],
+    [  0,  40,  97],
+    [  0,  41,  99],
+    [  0,  42, 100],
+    [  0,  42, 102],
+    [  0,  43, 104],
+    [  0,  44, 106],
+    [  0,  45, 108],
+    [  0,  45, 109],
+    [  0,  46, 110],
+    [  0,  46, 111],
+    [  0,  47, 111],
+    [  0,  47, 111],
+    [  0,  48, 111],
+    [  0,  49, 111],
+    [  0,  49, 111],
+    [  0,  50, 110],
+    [  0,  51, 110],
+    [  0,  52, 110],
+    [  0,  52, 110],
+    [  1,  53, 110],
+    [  6,  54, 110],
+    [ 10,  55, 109],
+    [ 14,  55, 109],
+    [ 18,  56, 109],
+    [ 21,  57, 109],
+    [ 23,  57, 109],
+    [ 26,  58, 108],
+    [ 28,  59, 108],
+    [ 30,  60, 108],
+    [ 32,  60, 108],
+    [ 34,  61, 108],
+    [ 36,  62, 108],
+    [ 38,  62, 108],
+    [ 39,  63, 108],
+    [ 41,  64, 107],
+    [ 43,  65, 107],
+    [ 44,  65, 107],
+    [ 46,  66, 107],
+    [ 47,  67, 107],
+    [ 49,  68, 107],
+    [ 50,  68, 107],
+    [ 51,  69, 107],
+    [ 53,  70, 107],
+    [ 54,  70, 107],
+    [ 55,  71, 107],
+    [ 56,  72, 107],
+    [ 58,  73, 107],
+    [ 59,  73, 107],
+    [ 60,  74, 107],
+    [ 61,  75, 107],
+    [ 62,  75, 107],
+    [ 64,  76, 107],
+    [ 65,  77, 107],
+    [ 66,  78, 107],
+    [ 67,  78, 107],
+    [ 68,  79, 107],
+    [ 69,  80, 107],
+    [ 70,  80, 107],
+    [ 71,  81, 107],
+    [ 72,  82, 107],
+    [ 73,  83, 107],
+    [ 74,  83, 107],
+    [ 75,  84, 107],
+    [ 76,  85, 107],
+    [ 77,  85, 107],
+    [ 78,  86, 107],
+    [ 79,  87, 108],
+    [ 80,  88, 108],
+    [ 81,  88, 108],
+    [ 82,  89, 108],
+    [ 83,  90, 108],
+    [ 84,  90, 108],
+    [ 85,  91, 108],
+    [ 86,  92, 108],
+    [ 87,  93, 109],
+    [ 88,  93, 109],
+    [ 89,  94, 109],
+    [ 90,  95, 109],
+    [ 91,  95, 109],
+    [ 92,  96, 109],
+    [ 93,  97, 110],
+    [ 94,  98, 110],
+    [ 95,  98, 110],
+    [ 95,  99, 110],
+    [ 96, 100, 110],
+    [ 97, 101, 111],
+    [ 98, 101, 111],
+    [ 99, 102, 111],
+    [100, 103, 111],
+    [101, 103, 111],
+    [102, 104, 112],
+    [103, 105, 112],
+    [104, 106, 112],
+    [104, 106, 112],
+    [105, 107, 113],
+    [106, 108, 113],
+    [107, 109, 113],
+    [108, 109, 114],
+    [109, 110, 114],
+    [110, 111, 114],
+    [111, 111, 114],
+    [111, 112, 115],
+    [112, 113, 115],
+    [113, 114, 115],
+    [114, 114, 116],
+    [115, 115, 116],
+    [116, 116, 117],
+    [117, 117, 117],
+    [117, 117, 117],
+    [118, 118, 118],
+    [119, 119, 118],
+    [120, 120, 118],
+    [121, 120, 119],
+    [122, 121, 119],
+    [123, 122, 119],
+    [123, 123, 120],
+    [124, 123, 120],
+    [125, 124, 120],
+    [126, 125, 120],
+    [127, 126, 120],
+    [128, 126, 120],
+    [129, 127, 120],
+    [130, 128, 120],
+    [131, 129, 120],
+    [132, 129, 120],
+    [133, 130, 120],
+    [134, 131, 120],
+    [135, 132, 120],
+    [136, 133, 120],
+    [137, 133, 120],
+    [138, 134, 120],
+    [139, 135, 120],
+    [140, 136, 120],
+    [141, 136, 120],
+    [142, 137, 120],
+    [143, 138, 120],
+    [144, 139, 120],
+    [145, 140, 120],
+    [146, 140, 120],
+    [147, 141, 120],
+    [148, 142, 120],
+    [149, 143, 120],
+    [150, 143, 119],
+    [151, 144, 119],
+    [152, 145, 119],
+    [153, 146, 119],
+    [154, 147, 119],
+    [155, 147, 119],
+    [156, 148, 119],
+    [157, 149, 119],
+    [158, 150, 118],
+    [159, 151, 118],
+    [160, 152, 118],
+    [161, 152, 118],
+    [162, 153, 118],
+    [163, 154, 117],
+    [164, 155, 117],
+    [165, 156, 117],
+    [166, 156, 117],
+    [167, 157, 117],
+    [168, 158, 116],
+    [169, 159, 116],
+    [170, 160, 116],
+    [171, 161, 116],
+    [172, 161, 115],
+    [173, 162, 115],
+    [174, 163, 115],
+    [175, 164, 115],
+    [176, 165, 114],
+    [177, 166, 114],
+    [178, 166, 114],
+    [180, 167, 113],
+    [181, 168, 113],
+    [182, 169, 113],
+    [183, 170, 112],
+    [184, 171, 112],
+    [185, 171, 112],
+    [186, 172, 111],
+    [187, 173, 111],
+    [188, 174, 110],
+    [189, 175, 110],
+    [190, 176, 110],
+    [191, 177, 109],
+    [192, 177, 109],
+    [193, 178, 108],
+    [194, 179, 108],
+    [195, 180, 108],
+    [197, 181, 107],
+    [198, 182, 107],
+    [199, 183, 106],
+    [200, 184, 106],
+    [201, 184, 105],
+    [202, 185, 105],
+    [203, 186, 104],
+    [204, 187, 104],
+    [205, 188, 103],
+    [206, 189, 103],
+    [208, 190, 102],
+    [209, 191, 102],
+    [210, 192, 101],
+    [211, 192, 101],
+    [212, 193, 100],
+    [213, 194,  99],
+    [214, 195,  99],
+    [215, 196,  98],
+    [216, 197,  97],
+    [217, 198,  97],
+    [219, 199,  96],
+    [220, 200,  96],
+    [221, 201,  95],
+    [222, 202,  94],
+    [223, 203,  93],
+    [224, 203,  93],
+    [225, 204,  92],
+    [227, 205,  91],
+    [228, 206,  91],
+    [229, 207,  90],
+    [230, 208,  89],
+    [231, 209,  88],
+    [232, 210,  87],
+    [233, 211,  86],
+    [235, 212,  86],
+    [236, 213,  85],
+    [237, 214,  84],
+    [238, 215,  83],
+    [239, 216,  82],
+    [240, 217,  81],
+    [241, 218,  80],
+    [243, 219,  79],
+    [244, 220,  78],
+    [245, 221,  77],
+    [246, 222,  76],
+    [247, 223,  75],
+    [249, 224,  73],
+    [250, 224,  72],
+    [251, 225,  71],
+    [252, 226,  70],
+    [253, 227,  69],
+    [255, 228,  67],
+    [255, 229,  66],
+    [255, 230,  66],
+    [255, 231,  67],
+    [255, 232,  68],
+    [255, 233,  69],
+]) / 255.0
+cividis_map.flags.writeable = False
@@ -0,0 +1,282 @@
+"""
+Copyright 2021 Mark E. Fuller
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import re
+
+import numpy as np
+
+
+def equilibrium_temperature(gas, mode="UV"):
+    """
+    Adiabatic equilibrium temperature of the current gas state.
+    The gas state is restored before returning.
+    """
+    state = gas.state
+    try:
+        gas.equilibrate(mode)
+        Teq = gas.T
+    except Exception:
+        # no usable estimate; ignition can then never be confirmed
+        Teq = np.nan
+    gas.state = state
+    return Teq
+
+
+class IDTDefinition:
+    """
+    Base class for an ignition delay definition evaluated online.
+
+    Subclasses track only the running extremum or crossing they need.
+    update() is called once per integrator step with the time, temperature,
+    pressure and mole fraction array; settled() reports whether the
+    definition can no longer change once ignition has been confirmed.
+    """
+
+    name = None
+    species = None
+
+    def reset(self, t, T, P, X):
+        raise NotImplementedError
+
+    def update(self, t, T, P, X):
+        raise NotImplementedError
+
+    def settled(self, progress, relaxation):
+        raise NotImplementedError
+
+    @property
+    def tau(self):
+        raise NotImplementedError
+
+
+class RateMaximum(IDTDefinition):
+    """
+    Time of the maximum rate of rise of "P" or "T" (or a species mole
+    fraction), assigned to the end of the steepest step.
+    """
+
+    def __init__(self, quantity="P"):
+        self.quantity = quantity
+        self.name = f"d{quantity}dt"
+        if quantity not in ("P", "T"):
+            self.species = quantity
+
+    def _value(self, T, P, X):
+        if self.quantity == "P":
+            return P
+        if self.quantity == "T":
+            return T
+        return X[self.k]
+
+    def reset(self, t, T, P, X):
+        self._t = t
+        self._value0 = self._value(T, P, X)
+        self.rate = 0.0
+        self.peak = -np.inf
+        self.tpeak = np.nan
+
+    def update(self, t, T, P, X):
+        dt = t - self._t
+        if dt <= 0.0:
+            return
+        value = self._value(T, P, X)
+        self.rate = (value - self._value0) / dt
+        self._t = t
+        self._value0 = value
+        if self.rate > self.peak:
+            self.peak = self.rate
+            self.tpeak = t
+
+    def settled(self, progress, relaxation):
+        return self.rate <= relaxation * self.peak
+
+    @property
+    def tau(self):
+        return float(self.tpeak)
+
+
+class SpeciesPeak(IDTDefinition):
+    """
+    Time of the peak mole fraction of a species, e.g. "OH", "OH*", "CH*".
+    """
+
+    def __init__(self, species):
+        self.species = species
+        self.name = species
+
+    def reset(self, t, T, P, X):
+        self.value = self.peak = X[self.k]
+        self.tpeak = t
+
+    def update(self, t, T, P, X):
+        self.value = X[self.k]
+        if self.value > self.peak:
+            self.peak = self.value
+            self.tpeak = t
+
+    def settled(self, progress, relaxation):
+        # fallen past the peak, or a monotonic approach to equilibrium
+        return self.value <= (1.0 - relaxation) * self.peak or progress >= 1.0 - relaxation
+
+    @property
+    def tau(self):
+        return float(self.tpeak)
+
+
+class Threshold(IDTDefinition):
+    """
+    First time a quantity ("T", "P" or a species mole fraction) crosses a level,
+    either an absolute value or a rise above its initial value. The crossing
+    time is interpolated linearly within the step. name defaults to a spec
+    such as "OH>0.0001" or "T+400".
+    """
+
+    def __init__(self, quantity, value=None, rise=None, name=None):
+        if (value is None) == (rise is None):
+            raise ValueError("Threshold needs exactly one of value or rise")
+        self.quantity = quantity
+        self.value = value
+        self.rise = rise
+        if quantity not in ("P", "T"):
+            self.species = quantity
+        if name is not None:
+            self.name = name
+        elif value is not None:
+            self.name = f"{quantity}>{value:g}"
+        else:
+            self.name = f"{quantity}+{rise:g}"
+
+    def _value(self, T, P, X):
+        if self.quantity == "P":
+            return P
+        if self.quantity == "T":
+            return T
+        return X[self.k]
+
+    def reset(self, t, T, P, X):
+        v = self._value(T, P, X)
+        self.level = self.value if self.value is not None else v + self.rise
+        self.tcross = t if v >= self.level else np.nan
+        self._t = t
+        self._v = v
+
+    def update(self, t, T, P, X):
+        if not np.isnan(self.tcross):
+            return
+        v = self._value(T, P, X)
+        if v >= self.level:
+            self.tcross = self._t + (t - self._t) * (self.level - self._v) / (v - self._v)
+        self._t = t
+        self._v = v
+
+    def settled(self, progress, relaxation):
+        return not np.isnan(self.tcross) or progress >= 1.0 - relaxation
+
+    @property
+    def tau(self):
+        return float(self.tcross)
+
+
+_threshold = re.compile(r"^(.+?)([>+])([-+0-9.eE]+)$")
+
+
+def parse_definition(spec):
+    """
+    Build an IDTDefinition from a short string:
+        "P", "dPdt"   maximum dP/dt
+        "T", "dTdt"   maximum dT/dt
+        "T+400"       temperature rise of 400 K
+        "OH>1e-4"     OH mole fraction first exceeding 1e-4
+        "OH", "CH*"   peak mole fraction of the species
+    IDTDefinition instances are passed through.
+    """
+    if isinstance(spec, IDTDefinition):
+        return spec
+    if spec in ("P", "dPdt"):
+        return RateMaximum("P")
+    if spec in ("T", "dTdt"):
+        return RateMaximum("T")
+    m = _threshold.match(spec)
+    if m:
+        quantity, op, level = m.group(1), m.group(2), float(m.group(3))
+        # the caller's spelling of the level is kept as the name
+        if op == ">":
+            return Threshold(quantity, value=level, name=spec)
+        return Threshold(quantity, rise=level, name=spec)
+    return SpeciesPeak(spec)
+
+
+def record_dtype(definitions):
+    """
+    NumPy structured dtype with one float field per definition.
+    """
+    return np.dtype([(parse_definition(d).name, float) for d in definitions])
+
+
+class IgnitionMonitor:
+    """
+    Evaluates a set of IDT definitions during one integration.
+
+    Ignition is confirmed once the temperature has covered more than `confirm`
+    of the rise to the adiabatic equilibrium temperature Teq. The integration
+    is done once ignition is confirmed and every definition has settled
+    (rates relaxed below `relaxation` times their maximum, species peaks
+    passed, thresholds crossed).
+    Until ignition is confirmed every tau is NaN.
+    """
+
+    def __init__(self, definitions, gas, relaxation=0.05, confirm=0.5):
+        self.definitions = [parse_definition(d) for d in definitions]
+        for d in self.definitions:
+            if d.species is not None:
+                d.k = gas.species_index(d.species)
+        self.relaxation = relaxation
+        self.confirm = confirm
+
+    @property
+    def species(self):
+        """
+        Species referenced by the definitions, in order and without repeats.
+        """
+        return list(dict.fromkeys(d.species for d in self.definitions if d.species))
+
+    def reset(self, t, T, P, X, Teq):
+        self.T0 = T
+        self.Trise = Teq - T
+        self.ignited = False
+        self.done = False
+        for d in self.definitions:
+            d.reset(t, T, P, X)
+
+    def update(self, t, T, P, X):
+        """
+        Process one step; returns True once integration can stop.
+        """
+        for d in self.definitions:
+            d.update(t, T, P, X)
+        # fraction of the way to equilibrium; NaN compares False
+        progress = (T - self.T0) / self.Trise if self.Trise > 1.0 else 0.0
+        if progress >= self.confirm:
+            self.ignited = True
+        if self.ignited:
+            self.done = all(d.settled(progress, self.relaxation) for d in self.definitions)
+        return self.done
+
+    def results(self):
+        """
+        Dict of tau per definition name; NaN if ignition was not confirmed.
+        """
+        return {d.name: (d.tau if self.ignited else np.nan) for d in self.definitions}
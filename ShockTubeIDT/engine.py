@@ -0,0 +1,162 @@
+"""
+Copyright 2021 Mark E. Fuller
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import cantera as ct
+import numpy as np
+
+from .mechanism_cache import cached_engines
+
+REACTOR_MODES = ("UV", "HP", "compression")
+
+# engines of Solutions not from the mechanism cache, keyed by id() and mode
+_engines = {}
+MAX_ENGINES = 16
+
+
+def compression_schedule(gas, pressureRatio, endTime, n=1000):
+    """
+    Wall velocity that makes a unit volume of the current gas follow
+    P(t) = P0 * pressureRatio(t) by isentropic compression of the unreacted
+    mixture (the usual way to impose a facility dP/dt).
+    Returns (times, dV/dt) on n points spanning [0, endTime], spaced
+    geometrically so that early times are resolved as well as late ones.
+    """
+    times = np.concatenate(([0.0], np.geomspace(1e-6 * endTime, endTime, n - 1)))
+    ratio = np.asarray(pressureRatio(times), dtype=float) * np.ones_like(times)
+    if np.ptp(ratio) == 0.0:
+        return times, np.zeros_like(times)
+
+    state = gas.state
+    s0, P0, v0 = gas.s, gas.P, gas.v
+    grid = np.linspace(ratio.min(), ratio.max(), 200)
+    vgrid = np.empty_like(grid)
+    for k, rr in enumerate(grid):
+        gas.SP = s0, P0 * rr
+        vgrid[k] = gas.v / v0
+    gas.state = state
+
+    V = np.interp(ratio, grid, vgrid)
+    return times, np.gradient(V, times)
+
+
+def pressure_ratio(pressureRise=None, pressureProfile=None):
+    """
+    P(t)/P0 for "compression" mode, from a constant fractional rise
+    pressureRise = (dP/dt)/P0 in 1/s, or from pressureProfile: a callable
+    of time returning P/P0, or a pair of arrays (times, P/P0) that is
+    interpolated linearly.
+    """
+    if pressureRise is not None:
+        return lambda t: 1.0 + pressureRise * t
+    if callable(pressureProfile):
+        return pressureProfile
+    if pressureProfile is not None:
+        times, ratio = (np.asarray(a, dtype=float) for a in pressureProfile)
+        return lambda t: np.interp(t, times, ratio)
+    raise ValueError("compression mode needs pressureRise or pressureProfile")
+
+
+class IDTEngine:
+    """
+    Reusable reactor/network pair for repeated IDT calculations on one gas.
+
+    The reactor and ReactorNet (and with them the CVODES workspace)
+    are built once. start() copies the current state of the gas into the
+    reactor and restarts the integrator at t = 0, keeping solver settings
+    such as rtol, atol and max_time_step between points.
+
+    mode selects the reactor model:
+        "UV"          constant volume (IdealGasReactor)
+        "HP"          constant pressure (IdealGasConstPressureReactor)
+        "compression" constant volume with a moving wall that imposes a
+                      pressure history by isentropic compression; the
+                      history is passed to start()
+    """
+
+    def __init__(self, gas, mode="UV", rtol=None, atol=None, max_steps=None):
+        if mode not in REACTOR_MODES:
+            raise ValueError(f"Unknown reactor mode {mode!r}; use one of {REACTOR_MODES}")
+        self.gas = gas
+        self.mode = mode
+        if mode == "HP":
+            self.reactor = ct.IdealGasConstPressureReactor(gas, name="Batch Reactor")
+        else:
+            self.reactor = ct.IdealGasReactor(gas, name="Batch Reactor")
+        self.wall = None
+        if mode == "compression":
+            # the surroundings only anchor the wall; their state is irrelevant
+            env = ct.Reservoir(ct.Solution(thermo="ideal-gas", species=[gas.species(0)]))
+            self.wall = ct.Wall(self.reactor, env, A=1.0)
+        self.network = ct.ReactorNet([self.reactor])
+        # ReactorBase.thermo is deprecated in favour of .phase (Cantera 3.2)
+        self.phase = getattr(self.reactor, "phase", None) or self.reactor.thermo
+        # newer Cantera versions may give the reactor its own copy of the gas
+        self._shared = self.phase is gas
+        if rtol is not None:
+            self.network.rtol = rtol
+        if atol is not None:
+            self.network.atol = atol
+        if max_steps is not None:
+            self.network.max_steps = max_steps
+
+    def start(self, pressureRatio=None, endTime=1.0):
+        """
+        Load the current gas state and reset the time to zero.
+        In "compression" mode, pressureRatio(t) = P(t)/P0 over [0, endTime]
+        sets the wall motion for this point.
+        Returns (reactor, network).
+        """
+        if self.wall is not None:
+            if pressureRatio is None:
+                raise ValueError("compression mode needs a pressure history")
+            times, dVdt = compression_schedule(self.gas, pressureRatio, endTime)
+            if hasattr(ct, "Tabulated1"):
+                self.wall.velocity = ct.Tabulated1(times, dVdt)
+            else:
+                self.wall.velocity = lambda t: np.interp(t, times, dVdt)
+            self.reactor.volume = 1.0
+
+        if not self._shared:
+            self.phase.state = self.gas.state
+        self.reactor.syncState()
+        if hasattr(self.network, "set_initial_time"):
+            # Cantera < 3.0
+            self.network.set_initial_time(0.0)
+        else:
+            self.network.initial_time = 0.0
+        return self.reactor, self.network
+
+
+def engine_for(gas, mode="UV"):
+    """
+    IDTEngine for gas and reactor mode, built once per process and Solution.
+    Engines of Solutions from the mechanism cache are stored with them and
+    released when the mechanism is evicted.
+    """
+    engines = cached_engines(gas)
+    if engines is not None:
+        if mode not in engines:
+            engines[mode] = IDTEngine(gas, mode)
+        return engines[mode]
+
+    key = (id(gas), mode)
+    entry = _engines.get(key)
+    if entry is None or entry[0] is not gas:
+        if len(_engines) >= MAX_ENGINES:
+            _engines.clear()
+        entry = (gas, IDTEngine(gas, mode))
+        _engines[key] = entry
+    return entry[1]
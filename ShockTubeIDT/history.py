@@ -0,0 +1,177 @@
+"""
+Copyright 2021 Mark E. Fuller
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class HistoryBuffer:
+    """
+    Growable, array-backed storage for reactor time histories.
+
+    Rows are written into a preallocated float64 array which doubles in size
+    when full, so appending every integrator step costs amortized O(1).
+    A DataFrame is only built on request with to_dataframe().
+    """
+
+    def __init__(self, columns, capacity=1024):
+        self.columns = list(columns)
+        self._data = np.empty((max(int(capacity), 1), len(self.columns)))
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+    def append(self, row):
+        """
+        Store one row; row may be any sequence with one value per column.
+        """
+        if self._n == self._data.shape[0]:
+            grown = np.empty((2 * self._data.shape[0], self._data.shape[1]))
+            grown[: self._n] = self._data[: self._n]
+            self._data = grown
+        self._data[self._n] = row
+        self._n += 1
+
+    def clear(self):
+        """
+        Discard stored rows but keep the allocated storage for reuse.
+        """
+        self._n = 0
+
+    @property
+    def data(self):
+        """
+        View of the filled part of the buffer (no copy).
+        """
+        return self._data[: self._n]
+
+    def column(self, name):
+        """
+        View of a single column by name.
+        """
+        return self._data[: self._n, self.columns.index(name)]
+
+    def to_dataframe(self, index=None):
+        """
+        Build a DataFrame from the stored rows, optionally indexed by a column.
+        """
+        df = pd.DataFrame(self.data.copy(), columns=self.columns)
+        if index is not None:
+            df = df.set_index(index)
+        return df
+
+
+# fixed size of the .npy header, so the final shape can be written in place
+_HEADER = 128
+
+
+def _npy_header(nrows, ncols):
+    d = repr({"descr": "<f8", "fortran_order": False, "shape": (nrows, ncols)})
+    pad = _HEADER - 10 - len(d) - 1
+    return b"\x93NUMPY\x01\x00" + (_HEADER - 10).to_bytes(2, "little") + (d + " " * pad + "\n").encode()
+
+
+class HistoryWriter:
+    """
+    Streams reactor time histories to a .npy file while integrating.
+
+    Rows of time, temperature, pressure and the mole fractions of the
+    selected species (default: all) are collected in a buffer of `chunk`
+    rows that is appended to the file when full, so memory use does not
+    grow with the length of the history. With interval > 0, a row is only
+    kept once at least `interval` seconds have passed since the last kept
+    row; the final state is always kept. Column names and any attributes
+    passed to close() go to a .json file next to it; read_history loads both.
+    """
+
+    def __init__(self, path, gas, species=None, interval=0.0, chunk=4096):
+        if species is None:
+            species = gas.species_names
+        self.path = path
+        self.columns = ["time", "temperature", "pressure"] + list(species)
+        self._ks = np.array([gas.species_index(k) for k in species], dtype=int)
+        self.interval = interval
+        self._buffer = np.empty((chunk, len(self.columns)))
+        self._n = 0
+        self._rows = 0
+        self._next = -np.inf
+        self._skipped = None
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._file = open(path, "wb")
+        self._file.write(_npy_header(0, len(self.columns)))
+
+    def append(self, t, T, P, X):
+        """
+        Offer the state at time t; X holds the mole fractions of all species.
+        """
+        if t < self._next:
+            self._skipped = (t, T, P, X)
+            return
+        self._skipped = None
+        self._next = t + self.interval
+        row = self._buffer[self._n]
+        row[0] = t
+        row[1] = T
+        row[2] = P
+        row[3:] = X[self._ks]
+        self._n += 1
+        if self._n == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        self._file.write(self._buffer[: self._n].tobytes())
+        self._rows += self._n
+        self._n = 0
+
+    def close(self, **attrs):
+        """
+        Write the remaining rows and the final shape.
+        """
+        if self._skipped is not None:
+            self._next = -np.inf
+            self.append(*self._skipped)
+        self.flush()
+        self._file.seek(0)
+        self._file.write(_npy_header(self._rows, len(self.columns)))
+        self._file.close()
+        meta = {"columns": self.columns, "attrs": attrs}
+        with open(os.path.splitext(self.path)[0] + ".json", "w") as f:
+            json.dump(meta, f, indent=1, default=float)
+
+
+def read_history(path, columns=None, mmap=True):
+    """
+    Time history written by HistoryWriter as a DataFrame indexed by time,
+    optionally restricted to some columns. With mmap=True, only the
+    selected columns are copied into memory.
+    """
+    with open(os.path.splitext(path)[0] + ".json") as f:
+        meta = json.load(f)
+    data = np.load(path, mmap_mode="r" if mmap else None)
+    names = meta["columns"]
+    if columns is None:
+        columns = names[1:]
+    cols = [names.index(c) for c in ["time"] + list(columns)]
+    df = pd.DataFrame(np.array(data[:, cols]), columns=[names[c] for c in cols])
+    df = df.set_index("time")
+    df.attrs.update(meta["attrs"])
+    return df
@@ -0,0 +1,64 @@
+"""
+Copyright 2021 Mark E. Fuller
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import numpy as np
+
+
+class HorizonEstimator:
+    """
+    Predicts the integration horizon of the next point along a sweep.
+
+    A running Arrhenius fit, log(tau) = a + b * 1000/T, is made through the
+    last `window` ignited points; the predicted horizon is `safety` times the
+    fitted tau, limited to [minTime, maxTime]. Until two points have ignited,
+    maxTime is returned.
+    """
+
+    def __init__(self, maxTime=1.0, safety=10.0, minTime=1e-6, window=4):
+        self.maxTime = maxTime
+        self.safety = safety
+        self.minTime = minTime
+        self.window = window
+        self._invT = []
+        self._logtau = []
+
+    def add(self, T, tau):
+        """
+        Record the result of a point; non-igniting points (NaN) are skipped.
+        """
+        if tau is None or not np.isfinite(tau) or tau <= 0.0:
+            return
+        self._invT.append(1000.0 / T)
+        self._logtau.append(np.log(tau))
+        del self._invT[: -self.window]
+        del self._logtau[: -self.window]
+
+    def fit(self):
+        """
+        (a, b) of the current Arrhenius fit, or None with fewer than two points.
+        """
+        if len(self._invT) < 2 or np.ptp(self._invT) == 0.0:
+            return None
+        b, a = np.polyfit(self._invT, self._logtau, 1)
+        return a, b
+
+    def predict(self, T):
+        coeffs = self.fit()
+        if coeffs is None:
+            return self.maxTime
+        a, b = coeffs
+        horizon = self.safety * np.exp(a + b * 1000.0 / T)
+        return float(np.clip(horizon, self.minTime, self.maxTime))
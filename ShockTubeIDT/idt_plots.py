@@ -14,12 +14,18 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-import matplotlib.gridspec as gridspec
-import matplotlib.pyplot as plt
+import hashlib
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from matplotlib.ticker import MaxNLocator
 import matplotlib.colors as mcolors
 import numpy as np
-from cividisHexValues import cividis_map
+from .cividisHexValues import cividis_map
 
 # https://matplotlib.org/stable/api/markers_api.html
 markers = ["o", "s", "*", "^", "v", ">", "<", "h", "p", "D", "+", "|"]
@@ -30,66 +36,165 @@ styles = ["-", "--", ":", "-."]
 # https://matplotlib.org/stable/gallery/color/named_colors.html
 tabcolors = list(mcolors.TABLEAU_COLORS)
 
-def line_colors(n: int, cmap: list = None):
+# palettes already sampled, keyed by (n, interpolate, colormap)
+_palettes = {}
+
+
+def _rgb(cmap):
+    """
+    Colormap as an (entries, 3) float array; accepts any sequence of
+    matplotlib colors, e.g. hex strings, or an RGB array.
+    """
+    arr = np.asarray(cmap)
+    if arr.ndim == 2 and arr.dtype.kind == "f":
+        return arr[:, :3]
+    return mcolors.to_rgba_array(cmap)[:, :3]
+
+
+def line_colors(n: int, cmap: list = None, interpolate: bool = False):
     """
     With n lines and given colormap, cmap, return evenly spaced set of colors
     for plotting. If using multiple line styles (quantity s), recommend passing
     n%s as first argument to utilize more widely-spaced colors.
     Default to using cividis color map with option to override.
+
+    Colors are returned as a read-only (n, 3) RGB array and cached per (n, cmap).
+    Entries are picked from the map without interpolation unless interpolate
+    is set or n exceeds the number of entries.
     """
 
     # cividis color map values from
     # https://github.com/pnnl/cmaputil/blob/master/colormaps/cividisHexValues.txt
     if cmap is None:
-        cmap = cividis_map
+        rgb = cividis_map
+        key = None
+    else:
+        rgb = _rgb(cmap)
+        key = rgb.tobytes()
 
     # check n
-    if n < 1 or not isinstance(n, int):
+    if n < 1 or not isinstance(n, (int, np.integer)):
         print(f"A positive integer number of lines is required; {n} was requested")
         print("Exiting")
         return
 
-    # check cmap
-    a = len(cmap)  # get dimensions of colormap
-    if n > a:
-        print(f"Requesting {n} lines when colormap contains only {a} entries!")
-        print("Exiting")
-        return
-
-    clist = []  # initialize empty list for colors
-    clist.append(cmap[0][:])  # first entry is first line
-
-    if n > 1:
+    a = len(rgb)  # get dimensions of colormap
+    interpolate = interpolate or n > a
+    palette = _palettes.get((n, interpolate, key))
+    if palette is not None:
+        return palette
+
+    # first entry is first line, last entry is last line
+    q = np.arange(n) * ((a - 1) / max(n - 1, 1))
+    if interpolate:
+        lo = np.minimum(q.astype(int), a - 2) if a > 1 else np.zeros(n, dtype=int)
+        w = (q - lo)[:, np.newaxis]
+        palette = rgb[lo] * (1.0 - w) + rgb[np.minimum(lo + 1, a - 1)] * w
+    else:
         # pull evenly spaced values without linear interpolation
-        for k in range(1, n):
-            q = float(k * (a - 1)) / float(n - 1)
-            clist.append(cmap[int(np.rint(q))][:])
+        palette = rgb[np.rint(q).astype(int)]
+    palette.flags.writeable = False
+    _palettes[(n, interpolate, key)] = palette
+    return palette
 
-    return clist
 
-def comp_mix_mech(mixes, mechs, temps, IDTs, ofname):
+def _render(fname, figsize, draw, args):
     """
-    Routine to plot comparison of igntion delay times for matrix of mechanisms and compositions.
-    Prints and saves plot showing absolute values and relative times.
+    Draw one figure with the object-oriented Agg API and save it.
+    The figure is never registered with pyplot, so it is freed on return.
     """
-    wdth = np.ones(1)
-    hght = [
-        3,
-        1,
-    ]  # make the Arrhenius plots 3 times larger than the comparison plot
-    gs = gridspec.GridSpec(2, 1, width_ratios=wdth, height_ratios=hght)
+    fig = Figure(dpi=600, figsize=figsize)
+    FigureCanvasAgg(fig)
+    draw(fig, *args)
+    fig.tight_layout()
+    fig.savefig(fname)
+    fig.clear()
+    return fname
+
+
+def _digest(figsize, draw, args):
+    # fingerprint of everything that goes into a figure
+    data = pickle.dumps((draw.__name__, figsize, args), protocol=4)
+    return hashlib.sha256(data).hexdigest()
 
-    # Plot figures at 2.64" width: standard ProCI column
-    fig = plt.figure(dpi=600, figsize=(2.64, 3.5))
+
+MANIFEST = ".idt_plots.json"
+
+
+def render_figures(jobs, max_workers=1, incremental=False):
+    """
+    Render a batch of figures, each given as (fname, figsize, draw, args)
+    where draw(fig, *args) fills a matplotlib Figure.
+
+    With max_workers other than 1 the figures are rendered in a process pool
+    (max_workers=None uses all cores). With incremental=True, a figure is
+    skipped if its file exists and its inputs are unchanged since it was last
+    rendered; input fingerprints are kept in a .idt_plots.json file next to
+    the figures.
+
+    Returns the file names that were rendered.
+    """
+    manifests = {}
+    digests = {}
+    todo = []
+    for job in jobs:
+        fname = job[0]
+        if incremental:
+            folder = os.path.dirname(os.path.abspath(fname))
+            if folder not in manifests:
+                try:
+                    with open(os.path.join(folder, MANIFEST)) as f:
+                        manifests[folder] = json.load(f)
+                except (OSError, ValueError):
+                    manifests[folder] = {}
+            digest = _digest(*job[1:])
+            digests[fname] = (folder, digest)
+            if manifests[folder].get(os.path.basename(fname)) == digest and os.path.exists(fname):
+                continue
+        todo.append(job)
+
+    if max_workers == 1 or len(todo) < 2:
+        rendered = [_render(*job) for job in todo]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+            rendered = list(pool.map(_render, *zip(*todo)))
+
+    if incremental and rendered:
+        for fname in rendered:
+            folder, digest = digests[fname]
+            manifests[folder][os.path.basename(fname)] = digest
+        for folder, manifest in manifests.items():
+            with open(os.path.join(folder, MANIFEST), "w") as f:
+                json.dump(manifest, f, indent=1)
+    return rendered
+
+
+def _figure_name(ofname, tag):
+    # split ofname at extension
+    fext = ofname.split(".")[-1]
+    fname = ofname.replace("." + fext, "")
+    return f"{fname}-{tag}.{fext}"
+
+
+def _gridspec(fig, RelPlot=True):
+    if RelPlot:
+        # make the Arrhenius plots 3 times larger than the comparison plot
+        return fig.add_gridspec(2, 1, width_ratios=np.ones(1), height_ratios=[3, 1])
+    return fig.add_gridspec(1, 1, width_ratios=[1], height_ratios=[1])
+
+
+def _draw_mix_mech(fig, temps, IDTs):
+    gs = _gridspec(fig)
+    nmix, nmech = IDTs.shape[:2]
 
     #import colors
     #colors = tabcolors
-    colors = line_colors(len(mixes))
+    colors = line_colors(nmix)
 
-    ax = plt.subplot(gs[0])
-    for q, X in enumerate(mixes):
-        for w, M in enumerate(mechs):
-            plt.semilogy(
+    ax = fig.add_subplot(gs[0])
+    for q in range(nmix):
+        for w in range(nmech):
+            ax.semilogy(
                 (1000.0 / temps),
                 IDTs[q, w, :],
                 ls=styles[w % len(styles)],
@@ -102,10 +207,10 @@ def comp_mix_mech(mixes, mechs, temps, IDTs, ofname):
     ax.set_ylabel("Ignition Delay (s)", fontsize=12)
     # ax.tick_params(labelsize=8)
 
-    ax = plt.subplot(gs[1])
-    for q, X in enumerate(mixes):
-        for w, M in enumerate(mechs):
-            plt.plot(
+    ax = fig.add_subplot(gs[1])
+    for q in range(nmix):
+        for w in range(nmech):
+            ax.plot(
                 (1000.0 / temps),
                 IDTs[q, w, :] / IDTs[q, 0, :],
                 ls=styles[w % len(styles)],
@@ -120,229 +225,240 @@ def comp_mix_mech(mixes, mechs, temps, IDTs, ofname):
     ax.yaxis.set_major_locator(MaxNLocator(4))
     # ax.tick_params(labelsize=6)
 
-    fig.tight_layout()
-    fig.savefig(ofname)
 
+def _draw_mix(fig, temps, w, IDTs, ref):
+    # IDTs and ref (the first mechanism) are indexed (mixture, T)
+    gs = _gridspec(fig)
 
-def comp_mix(mixes, mechs, temps, IDTs, ofname):
-    """
-    Routine to plot comparison of igntion delay times for matrix of mechanisms and compositions.
-    Compares IDT of different mixtures for each mechanism.
-    Prints and saves plot showing absolute values and relative times.
-    """
+    #import colors
+    #colors = tabcolors
+    colors = line_colors(len(IDTs))
+
+    ax = fig.add_subplot(gs[0])
+    for q in range(len(IDTs)):
+        ax.semilogy(
+            (1000.0 / temps),
+            IDTs[q, :],
+            ls=styles[w % len(styles)],
+            lw=2,
+            color=colors[q % len(colors)],
+        )
+
+    # ax.legend(loc="best", fontsize=2)
+    ax.grid()
+    ax.set_ylabel("Ignition Delay (s)", fontsize=12)
+    # ax.tick_params(labelsize=8)
+
+    ax = fig.add_subplot(gs[1])
+    for q in range(len(IDTs)):
+        ax.plot(
+            (1000.0 / temps),
+            IDTs[q, :] / ref[q, :],
+            ls=styles[w % len(styles)],
+            lw=2,
+            color=colors[q % len(colors)],
+        )
+
+    # ax.legend(loc='best',fontsize=14)
+    # ax.grid()
+    ax.set_xlabel("1000/T (1/K)", fontsize=12)
+    ax.set_ylabel("Ratio", fontsize=12)
+    ax.yaxis.set_major_locator(MaxNLocator(4))
+    # ax.tick_params(labelsize=6)
+
+
+def _draw_mech(fig, temps, q, nmix, mechs, IDTs):
+    # IDTs are indexed (mechanism, T) for mixture q
+    gs = _gridspec(fig)
+
+    #import colors
+    #colors = tabcolors
+    colors = line_colors(nmix)
+
+    ax = fig.add_subplot(gs[0])
     for w, M in enumerate(mechs):
-        wdth = np.ones(1)
-        hght = [
-            3,
-            1,
-        ]  # make the Arrhenius plots 3 times larger than the comparison plot
-        gs = gridspec.GridSpec(2, 1, width_ratios=wdth, height_ratios=hght)
-
-        # Plot figures at 2.64" width: standard ProCI column
-        fig = plt.figure(dpi=600, figsize=(2.64, 3.5))
-
-        #import colors
-        #colors = tabcolors
-        colors = line_colors(len(mixes))
-
-        ax = plt.subplot(gs[0])
-        for q, X in enumerate(mixes):
-            plt.semilogy(
+        if M.strip().lower() == "data":
+            ax.semilogy(
                 (1000.0 / temps),
-                IDTs[q, w, :],
-                ls=styles[w % len(styles)],
-                lw=2,
+                IDTs[w, :],
+                marker=markers[w % len(markers)],
+                ms=8,
                 color=colors[q % len(colors)],
             )
-
-        # ax.legend(loc="best", fontsize=2)
-        ax.grid()
-        ax.set_ylabel("Ignition Delay (s)", fontsize=12)
-        # ax.tick_params(labelsize=8)
-
-        ax = plt.subplot(gs[1])
-        for q, X in enumerate(mixes):
-            plt.plot(
+        else:
+            ax.semilogy(
                 (1000.0 / temps),
-                IDTs[q, w, :] / IDTs[q, 0, :],
+                IDTs[w, :],
                 ls=styles[w % len(styles)],
                 lw=2,
                 color=colors[q % len(colors)],
             )
 
-        # ax.legend(loc='best',fontsize=14)
-        # ax.grid()
-        ax.set_xlabel("1000/T (1/K)", fontsize=12)
-        ax.set_ylabel("Ratio", fontsize=12)
-        ax.yaxis.set_major_locator(MaxNLocator(4))
-        # ax.tick_params(labelsize=6)
+    # ax.legend(loc="best", fontsize=2)
+    ax.grid()
+    ax.set_ylabel("Ignition Delay (s)", fontsize=12)
+    # ax.tick_params(labelsize=8)
 
-        # split ofname at extension
-        fext = ofname.split(".")[-1]
-        fname = ofname.replace("." + fext, "")
+    ax = fig.add_subplot(gs[1])
+    for w, M in enumerate(mechs):
+        ax.plot(
+            (1000.0 / temps),
+            IDTs[w, :] / IDTs[0, :],
+            ls=styles[w % len(styles)],
+            lw=2,
+            color=colors[q % len(colors)],
+        )
 
-        fig.tight_layout()
-        fig.savefig(f"{fname}-mech{w}.{fext}")
+    # ax.legend(loc='best',fontsize=14)
+    # ax.grid()
+    ax.set_xlabel("1000/T (1/K)", fontsize=12)
+    ax.set_ylabel("Ratio", fontsize=12)
+    ax.yaxis.set_major_locator(MaxNLocator(4))
+    # ax.tick_params(labelsize=6)
 
 
-def comp_mech(mixes, mechs, temps, IDTs, ofname):
-    """
-    Routine to plot comparison of igntion delay times for matrix of mechanisms and compositions.
-    Compares IDT of different mechanisms for each mixtures.
-    Prints and saves plot showing absolute values and relative times.
-    Use mechanism name of "data" to plot with symbols, not lines.
-    """
-    for q, X in enumerate(mixes):
-        wdth = np.ones(1)
-        hght = [
-            3,
-            1,
-        ]  # make the Arrhenius plots 3 times larger than the comparison plot
-        gs = gridspec.GridSpec(2, 1, width_ratios=wdth, height_ratios=hght)
+def _draw_mech_data(fig, temps, q, X, mechs, IDTs, Tdata, Taudata, RelPlot, bands):
+    # IDTs and bands are indexed (mechanism, T) for mixture q
+    gs = _gridspec(fig, RelPlot)
 
-        # Plot figures at 2.64" width: standard ProCI column
-        fig = plt.figure(dpi=600, figsize=(2.64, 3.5))
+    #import colors
+    #colors = tabcolors
+    colors = line_colors(len(mechs))
+
+    ax = fig.add_subplot(gs[0])
+    for w, M in enumerate(mechs):
+        ax.semilogy(
+                (1000.0 / temps),
+                IDTs[w, :],
+                ls=styles[w % len(styles)],
+                lw=2,
+                color=colors[w % len(colors)],
+            )
+        if bands is not None and w < len(bands[0]):
+            ax.fill_between(
+                (1000.0 / temps),
+                bands[0][w, :],
+                bands[1][w, :],
+                color=colors[w % len(colors)],
+                alpha=0.3,
+                lw=0,
+            )
+    # add data
+    if Tdata is not None:
+        if Taudata is not None:
+            try:
+                ax.semilogy(
+                        (1000.0 / Tdata[q, w, :]),
+                        Taudata[q, w, :],
+                        ls='none',
+                        marker=markers[q],
+                        ms=8,
+                        markerfacecolor='none',
+                        markeredgewidth=1,
+                        color=colors[q],
+                    )
+            except:
+                print(f"Unable to plot data at mix {q} and mechanism {w}:")
+                print(X)
+                print(M)
+        else:
+            print("WARNING: experimental values for temperature have been passed, but not IDT values")
+    elif Taudata is not None:
+        print("WARNING: experimental IDT values have been passed, but not for temperature")
 
-        #import colors
-        #colors = tabcolors
-        colors = line_colors(len(mixes))
+    # ax.legend(loc="best", fontsize=2)
+    ax.grid()
+    ax.set_ylabel("Ignition Delay (s)", fontsize=12)
+    # ax.tick_params(labelsize=8)
 
-        ax = plt.subplot(gs[0])
+    if RelPlot:
+        ax = fig.add_subplot(gs[1])
         for w, M in enumerate(mechs):
-            if M.strip().lower() == "data":
-                plt.semilogy(
-                    (1000.0 / temps),
-                    IDTs[q, w, :],
-                    marker=markers[w % len(markers)],
-                    ms=8,
-                    color=colors[q % len(colors)],
-                )
-            else:
-                plt.semilogy(
-                    (1000.0 / temps),
-                    IDTs[q, w, :],
-                    ls=styles[w % len(styles)],
-                    lw=2,
-                    color=colors[q % len(colors)],
-                )
-
-        # ax.legend(loc="best", fontsize=2)
-        ax.grid()
-        ax.set_ylabel("Ignition Delay (s)", fontsize=12)
-        # ax.tick_params(labelsize=8)
-
-        ax = plt.subplot(gs[1])
-        for w, M in enumerate(mechs):
-            plt.plot(
+            ax.plot(
                 (1000.0 / temps),
-                IDTs[q, w, :] / IDTs[q, 0, :],
+                IDTs[w, :] / IDTs[0, :],
                 ls=styles[w % len(styles)],
                 lw=2,
-                color=colors[q % len(colors)],
+                color=colors[w % len(colors)],
             )
-
-        # ax.legend(loc='best',fontsize=14)
-        # ax.grid()
-        ax.set_xlabel("1000/T (1/K)", fontsize=12)
         ax.set_ylabel("Ratio", fontsize=12)
         ax.yaxis.set_major_locator(MaxNLocator(4))
-        # ax.tick_params(labelsize=6)
 
-        # split ofname at extension
-        fext = ofname.split(".")[-1]
-        fname = ofname.replace("." + fext, "")
+    # ax.legend(loc='best',fontsize=14)
+    # ax.grid()
+    ax.set_xlabel("1000/T (1/K)", fontsize=12)
+    # ax.tick_params(labelsize=6)
 
-        fig.tight_layout()
-        fig.savefig(f"{fname}-mix{q}.{fext}")
 
-def comp_mech_data(mixes, mechs, temps, IDTs, ofname, Tdata = None, Taudata = None, RelPlot = True):
+def comp_mix_mech(mixes, mechs, temps, IDTs, ofname, incremental=False):
     """
     Routine to plot comparison of igntion delay times for matrix of mechanisms and compositions.
-    Compares IDT of different mechanisms for each mixtures.
     Prints and saves plot showing absolute values and relative times.
-    **test function for data, dropping relative plot**
     """
-    for q, X in enumerate(mixes):
-        if RelPlot:
-            wdth = np.ones(1)
-            hght = [
-                3,
-                1,
-            ]  # make the Arrhenius plots 3 times larger than the comparison plot
-            gs = gridspec.GridSpec(2, 1, width_ratios=wdth, height_ratios=hght)
-
-            # Plot figures at 2.64" width: standard ProCI column
-            fig = plt.figure(dpi=600, figsize=(2.64, 3.5))
-        else:
-            wdth = [1]
-            hght = [1]
-            gs = gridspec.GridSpec(len(hght), len(wdth), width_ratios=wdth, height_ratios=hght)
+    # Plot figures at 2.64" width: standard ProCI column
+    IDTs = np.asarray(IDTs)[: len(mixes), : len(mechs)]
+    jobs = [(ofname, (2.64, 3.5), _draw_mix_mech, (np.asarray(temps), IDTs))]
+    return render_figures(jobs, incremental=incremental)
 
-            # Plot figures at 2.64" width: standard ProCI column
-            fig = plt.figure(dpi=600, figsize=(2.64, 2.64))
 
-        #import colors
-        #colors = tabcolors
-        colors = line_colors(len(mechs))
+def comp_mix(mixes, mechs, temps, IDTs, ofname, max_workers=1, incremental=False):
+    """
+    Routine to plot comparison of igntion delay times for matrix of mechanisms and compositions.
+    Compares IDT of different mixtures for each mechanism.
+    Prints and saves plot showing absolute values and relative times.
+    One figure per mechanism; see render_figures for max_workers and incremental.
+    """
+    IDTs = np.asarray(IDTs)[: len(mixes)]
+    temps = np.asarray(temps)
+    jobs = [
+        (_figure_name(ofname, f"mech{w}"), (2.64, 3.5), _draw_mix,
+         (temps, w, IDTs[:, w, :], IDTs[:, 0, :]))
+        for w, M in enumerate(mechs)
+    ]
+    return render_figures(jobs, max_workers, incremental)
 
-        ax = plt.subplot(gs[0])
-        for w, M in enumerate(mechs):
-            plt.semilogy(
-                    (1000.0 / temps),
-                    IDTs[q, w, :],
-                    ls=styles[w % len(styles)],
-                    lw=2,
-                    color=colors[w % len(colors)],
-                )
-        # add data
-        if Tdata is not None:
-            if Taudata is not None:
-                try:
-                    plt.semilogy(
-                            (1000.0 / Tdata[q, w, :]),
-                            Taudata[q, w, :],
-                            ls='none',
-                            marker=markers[q],
-                            ms=8,
-                            markerfacecolor='none',
-                            markeredgewidth=1,
-                            color=colors[q],
-                        )
-                except:
-                    print(f"Unable to plot data at mix {q} and mechanism {w}:")
-                    print(X)
-                    print(M)
-            else:
-                print("WARNING: experimental values for temperature have been passed, but not IDT values")
-        elif Taudata is not None:
-            print("WARNING: experimental IDT values have been passed, but not for temperature")
-
-        # ax.legend(loc="best", fontsize=2)
-        ax.grid()
-        ax.set_ylabel("Ignition Delay (s)", fontsize=12)
-        # ax.tick_params(labelsize=8)
-
-        if RelPlot:
-            ax = plt.subplot(gs[1])
-            for w, M in enumerate(mechs):
-                plt.plot(
-                    (1000.0 / temps),
-                    IDTs[q, w, :] / IDTs[q, 0, :],
-                    ls=styles[w % len(styles)],
-                    lw=2,
-                    color=colors[w % len(colors)],
-                )
-            ax.set_ylabel("Ratio", fontsize=12)
-            ax.yaxis.set_major_locator(MaxNLocator(4))
-
-        # ax.legend(loc='best',fontsize=14)
-        # ax.grid()
-        ax.set_xlabel("1000/T (1/K)", fontsize=12)
-        # ax.tick_params(labelsize=6)
-
-        # split ofname at extension
-        fext = ofname.split(".")[-1]
-        fname = ofname.replace("." + fext, "")
-
-        fig.tight_layout()
-        fig.savefig(f"{fname}-mix{q}.{fext}")
+
+def comp_mech(mixes, mechs, temps, IDTs, ofname, max_workers=1, incremental=False):
+    """
+    Routine to plot comparison of igntion delay times for matrix of mechanisms and compositions.
+    Compares IDT of different mechanisms for each mixtures.
+    Prints and saves plot showing absolute values and relative times.
+    Use mechanism name of "data" to plot with symbols, not lines.
+    One figure per mixture; see render_figures for max_workers and incremental.
+    """
+    IDTs = np.asarray(IDTs)
+    temps = np.asarray(temps)
+    jobs = [
+        (_figure_name(ofname, f"mix{q}"), (2.64, 3.5), _draw_mech,
+         (temps, q, len(mixes), list(mechs), IDTs[q, : len(mechs)]))
+        for q, X in enumerate(mixes)
+    ]
+    return render_figures(jobs, max_workers, incremental)
+
+def comp_mech_data(mixes, mechs, temps, IDTs, ofname, Tdata = None, Taudata = None, RelPlot = True, bands = None,
+                   max_workers=1, incremental=False):
+    """
+    Routine to plot comparison of igntion delay times for matrix of mechanisms and compositions.
+    Compares IDT of different mechanisms for each mixtures.
+    Prints and saves plot showing absolute values and relative times.
+    Optional uncertainty bands are a (lower, upper) pair of arrays indexed
+    (X, M, T) like IDTs, or (M, T) or (T) for a single mixture, drawn shaded;
+    uncertainty.stack_bands builds them from uncertainty.idt_uncertainty results.
+    One figure per mixture; see render_figures for max_workers and incremental.
+    **test function for data, dropping relative plot**
+    """
+    IDTs = np.asarray(IDTs)
+    temps = np.asarray(temps)
+    # Plot figures at 2.64" width: standard ProCI column
+    figsize = (2.64, 3.5) if RelPlot else (2.64, 2.64)
+    jobs = []
+    for q, X in enumerate(mixes):
+        qbands = None
+        if bands is not None:
+            # missing mixture and mechanism axes
+            qbands = tuple(np.asarray(b, dtype=float).reshape((1,) * (3 - np.ndim(b))
+                                                            + np.shape(b))[q]
+                           for b in bands)
+        jobs.append((_figure_name(ofname, f"mix{q}"), figsize, _draw_mech_data,
+                     (temps, q, X, list(mechs), IDTs[q], Tdata, Taudata, RelPlot, qbands)))
+    return render_figures(jobs, max_workers, incremental)
@@ -14,178 +14,384 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import time
+
 import cantera as ct
 import numpy as np
-import pandas as pd
+
+from .detection import IgnitionMonitor, equilibrium_temperature
+from .engine import IDTEngine, pressure_ratio
+from .history import HistoryBuffer, HistoryWriter
+from .instrument import point_record
+from .parallel import run_curves
+from .result_cache import state_key
+from .results import sweep_result
 
 ct.suppress_thermo_warnings()
 
 
-def ignition_delay(gas):
+def ignition_delay(gas, history=False, endTime=1.0, earlyStop=True, signal=None,
+                   relaxation=0.05, cache=None, definitions=None, horizon=None,
+                   growth=10.0, engine=None, mode="UV", pressureRise=None,
+                   pressureProfile=None, profile=None, historyFile=None,
+                   historySpecies=None, historyInterval=0.0):
     """
     Returns an ignition delay time from a Cantera Solution object.
 
     Set desired temperature, pressure, and composition before calling.
 
-    This function currently returns the maximum rate of pressure rise as the IDT.
-    If the returned value is 1 second, the mixture did not ignite (max. simulation time).
-    """
+    The IDT is the maximum rate of pressure rise (of temperature for mode
+    "HP"); signal selects another one (e.g. "T" or "OH"), and a list of
+    definitions gives a dict of tau per definition from one integration
+    (see detection.parse_definition). NaN if there is no ignition by endTime.
+    Integration stops once ignition is confirmed, unless earlyStop=False.
 
-    r = ct.IdealGasReactor(contents=gas, name="Batch Reactor")
-    reactorNetwork = ct.ReactorNet([r])
+    history=True also returns the time history as a DataFrame: (tau, df).
+    historyFile streams it to a .npy file instead (see history.HistoryWriter),
+    named by formatting it with the initial T and P, e.g. "{T:.0f}K.npy".
 
-    # This is a starting estimate. If you do not get an ignition within this time, increase it
-    estimatedIgnitionDelayTime = 1.0
+    mode is "UV", "HP" or "compression" (see engine.IDTEngine), the last with
+    a pressureRise or pressureProfile. cache (result_cache.ResultCache),
+    engine (engine.IDTEngine) and profile (instrument.Profiler) are optional
+    helpers for repeated calls.
+    """
+
+    if profile is not None:
+        start = time.perf_counter()
+        T0, P0 = gas.T, gas.P
+
+    pressureRatio = None
+    if mode == "compression":
+        if pressureProfile is not None and not callable(pressureProfile):
+            pressureProfile = [np.asarray(a, dtype=float).tolist() for a in pressureProfile]
+        pressureRatio = pressure_ratio(pressureRise, pressureProfile)
+
+    if signal is None:
+        signal = "T" if mode == "HP" else "P"
+    single = definitions is None
+    monitor = IgnitionMonitor([signal] if single else definitions, gas,
+                              relaxation=relaxation)
+    if mode == "HP" and any(d.name == "dPdt" for d in monitor.definitions):
+        raise ValueError("dP/dt is not an ignition criterion at constant pressure")
+
+    if engine is None or engine.mode != mode or engine.gas is not gas:
+        engine = IDTEngine(gas, mode)
+
+    # a callable pressure profile has no stable key
+    if callable(pressureProfile):
+        cache = None
+    if cache is not None:
+        names = [d.name for d in monitor.definitions]
+        # the horizon only affects run time, so it is not part of the key
+        key = state_key(gas, {"endTime": endTime, "earlyStop": earlyStop,
+                              "definitions": names, "relaxation": relaxation,
+                              "mode": mode, "pressureRise": pressureRise,
+                              "pressureProfile": pressureProfile,
+                              "rtol": engine.network.rtol, "atol": engine.network.atol})
+        if not history and historyFile is None:
+            tau = cache.get(key)
+            if tau is not None:
+                if profile is not None:
+                    profile(point_record(T0, P0, tau, time.perf_counter() - start,
+                                         0, 0, cached=True))
+                return tau
+
+    # equilibrium temperature is used to confirm ignition
+    Teq = equilibrium_temperature(gas, "HP" if mode == "HP" else "UV")
+
+    r, reactorNetwork = engine.start(pressureRatio, endTime)
+    phase = engine.phase
+
+    # Integration horizon. If you do not get an ignition within this time, increase it
+    estimatedIgnitionDelayTime = endTime if horizon is None else min(horizon, endTime)
     t = 0
+    retries = 0
+    steps = 0
+
+    timeHistory = None
+    if history:
+        # only the species used by the definitions are kept in the history
+        species = monitor.species
+        ks = [gas.species_index(k) for k in species]
+        columns = ["time", "temperature", "pressure"] + species
+        timeHistory = HistoryBuffer(columns)
+        row = np.empty(len(columns))
+
+    monitor.reset(t, phase.T, phase.P, phase.X, Teq)
+
+    writer = None
+    if historyFile is not None:
+        T, P, X = phase.TPX
+        writer = HistoryWriter(historyFile.format(T=T, P=P), gas, historySpecies,
+                               historyInterval)
+        writer.append(t, T, P, X)
+
+    while True:
+        t = reactorNetwork.step()
+        T, P, X = phase.TPX
+        steps += 1
+        if timeHistory is not None:
+            row[0] = t
+            row[1] = T
+            row[2] = P
+            row[3:] = X[ks]
+            timeHistory.append(row)
+        if writer is not None:
+            writer.append(t, T, P, X)
+        done = monitor.update(t, T, P, X)
+        if done and (earlyStop or t >= estimatedIgnitionDelayTime):
+            break
+        if t >= estimatedIgnitionDelayTime:
+            if estimatedIgnitionDelayTime >= endTime:
+                break
+            # overran the predicted window: widen it and carry on
+            estimatedIgnitionDelayTime = min(endTime, growth * estimatedIgnitionDelayTime)
+            retries += 1
+
+    tau = monitor.results()
+    if single:
+        tau = tau[monitor.definitions[0].name]
+    if cache is not None:
+        cache.put(key, tau)
+    if writer is not None:
+        writer.close(tau=tau)
+    if profile is not None:
+        profile(point_record(T0, P0, tau, time.perf_counter() - start,
+                             steps, retries, reactorNetwork))
+
+    if history:
+        return tau, timeHistory.to_dataframe(index="time")
+    return tau
 
-    # chemical or pressure-based IDT?
-    # Chem IDT for peak OH concentration used for HONO vs HNO2 ProCI
-    ChemIDT = False
+def _reduce(curves, Trange, kwargs):
+    """
+    Curves on skeletal mechanisms if kwargs holds a reduce option (which
+    is removed), and {full mechanism: skeletal file}; otherwise the curves
+    unchanged and None.
+    """
+    reduce = kwargs.pop("reduce", None)
+    if reduce is None:
+        return curves, None
+    from .reduction import reduce_curves
 
-    if ChemIDT:
-        # now compile a list of all variables for which we will store data
-        stateVariableNames = [r.component_name(item) for item in range(r.n_vars)]
-        # use the above list to create a DataFrame
-        timeHistory = pd.DataFrame(columns=stateVariableNames)
-    else:
-        # data frame to store only pressure history
-        pressuretime = pd.DataFrame(columns=["time", "pressure"])
+    options = dict(reduce) if isinstance(reduce, dict) else {"tolerance": reduce}
+    return reduce_curves(curves, Trange, **options, **kwargs)
 
-    counter = 1
-    while t < estimatedIgnitionDelayTime:
-        t = reactorNetwork.step()
-        if counter % 10 == 0:
-            # We will save only every 10th value. Otherwise, this takes too long
-            # Note that the species concentrations are mass fractions
-            if ChemIDT:
-                timeHistory.loc[t] = reactorNetwork.get_state()
-            else:
-                pressuretime.loc[t] = t, gas.P
-        counter += 1
-
-    if ChemIDT:
-        # We will use the 'oh' species to compute the ignition delay
-        # time if maximum OH
-        tau = timeHistory["OH"].idxmax()
-    else:
-        # dp/dt IDT
-        dpdtdf = pressuretime.diff()
-        dpdtdf["dPdt"] = dpdtdf["pressure"] / dpdtdf["time"]
-        tau = dpdtdf["dPdt"].idxmax()
+def _sweep(curves, Trange, dims, coords, max_workers, chunksize, labeled, kwargs):
+    """
+    Run the curves of a sweep and reshape the results to the axes in dims.
+    With labeled=True, returns a results.IDTResult carrying the coordinates
+    and per-point solve times instead of a bare array.
 
-    return tau
+    reduce=tolerance (or a dict of reduction.reduce_mechanism options
+    including tolerance) runs every curve on a skeletal mechanism reduced
+    for the envelope of the sweep; the full mechanisms are not modified.
+    """
 
-def idt_sweep_T(gas, Trange, P, X):
+    curves, reduced = _reduce(curves, Trange, kwargs)
+    IgnDelays, solveTimes = run_curves(ignition_delay, curves, Trange, max_workers,
+                                       chunksize, return_times=True, **kwargs)
+    shape = tuple(len(coords[d]) for d in dims)
+    IgnDelays = IgnDelays.reshape(shape)
+    solveTimes = solveTimes.reshape(shape)
+
+    if labeled:
+        result = sweep_result(IgnDelays, solveTimes, dims, coords)
+        if reduced is not None:
+            result.attrs["reduced"] = reduced
+        return result
+    return IgnDelays
+
+def idt_sweep_T(gas, Trange, P, X, max_workers=1, chunksize=None, labeled=False, **kwargs):
     """
     Calculate a single pressure/mixture IDT curve with one mechanism
+
+    Returns an array indexed (T).
+
+    Keyword arguments are passed to ignition_delay. With max_workers other
+    than 1 the points are run in a process pool (see parallel.run_curves).
+    labeled=True returns a results.IDTResult instead of a bare array; this
+    applies to all idt_sweep_* functions.
     """
 
-    # storage array for results
-    IgnDelays = np.empty(len(Trange))
+    curves = [(gas, P, X)]
+    coords = {"T": Trange}
 
-    #calculate ignition delays
-    for q, T in enumerate(Trange):
-        gas.TPX = T, P, X
-        IgnDelays[q] = ignition_delay(gas)
-    
-    return IgnDelays
+    return _sweep(curves, Trange, "T", coords, max_workers, chunksize, labeled, kwargs)
+
+def idt_sweep_T_adaptive(gas, Trange, P, X, tolerance=0.05, maxPoints=64, minStep=1.0,
+                         max_workers=1, chunksize=None, labeled=False, **kwargs):
+    """
+    Calculate a single IDT curve on an adaptively refined temperature grid
+
+    Starts from the coarse grid Trange and bisects (in 1000/T) the intervals
+    around points where ln(tau) deviates from the linear interpolation of
+    its neighbours by more than tolerance, and intervals across which the
+    mixture stops igniting. Refinement stops after maxPoints points in
+    total or when intervals are narrower than minStep K. The new points of
+    each pass are run together, in a process pool with max_workers other
+    than 1. With several IDT definitions the first one drives refinement.
+
+    All passes share one checkpoint log, whose points are keyed by
+    temperature (see checkpoint.point_keys), so an interrupted refinement
+    resumes by replaying the logged points of every pass.
+
+    Returns (Trange, IgnDelays) sorted by temperature, or a results.IDTResult
+    with labeled=True.
+    """
 
-def idt_sweep_TP(gas, Trange, Prange, X):
+    curves, reduced = _reduce([(gas, P, X)], Trange, kwargs)
+    x = np.unique(1000.0 / np.asarray(Trange, dtype=float))
+    newX = x
+    taus = None
+    solveTimes = np.empty(0)
+    while len(newX):
+        out, seconds = run_curves(ignition_delay, curves, 1000.0 / newX,
+                                  max_workers, chunksize, return_times=True, **kwargs)
+        if taus is None:
+            x, taus, solveTimes = newX, out[0], seconds[0]
+        else:
+            x = np.concatenate((x, newX))
+            taus = np.concatenate((taus, out[0]))
+            solveTimes = np.concatenate((solveTimes, seconds[0]))
+            order = np.argsort(x)
+            x, taus, solveTimes = x[order], taus[order], solveTimes[order]
+
+        budget = maxPoints - len(x)
+        if budget <= 0 or len(x) < 3:
+            break
+        values = taus if taus.dtype.names is None else taus[taus.dtype.names[0]]
+        logtau = np.log(values)
+
+        # deviation of interior points from their neighbours' chord
+        w = (x[1:-1] - x[:-2]) / (x[2:] - x[:-2])
+        deviation = np.abs((1.0 - w) * logtau[:-2] + w * logtau[2:] - logtau[1:-1])
+        score = np.zeros(len(x) - 1)
+        bad = np.nan_to_num(deviation, nan=0.0) > tolerance
+        np.maximum.at(score, np.flatnonzero(bad), deviation[bad])
+        np.maximum.at(score, np.flatnonzero(bad) + 1, deviation[bad])
+        # ignition boundary
+        score[np.isnan(logtau[:-1]) != np.isnan(logtau[1:])] = np.inf
+
+        # intervals too narrow in T are left alone
+        wide = 1000.0 / x[:-1] - 1000.0 / x[1:] > 2.0 * minStep
+        candidates = np.flatnonzero((score > 0.0) & wide)
+        candidates = candidates[np.argsort(-score[candidates], kind="stable")][:budget]
+        newX = np.sort(0.5 * (x[candidates] + x[candidates + 1]))
+
+    T = 1000.0 / x[::-1]
+    taus = taus[::-1]
+    if labeled:
+        result = sweep_result(taus, solveTimes[::-1], "T", {"T": T})
+        if reduced is not None:
+            result.attrs["reduced"] = reduced
+        return result
+    return T, taus
+
+def idt_sweep_TP(gas, Trange, Prange, X, max_workers=1, chunksize=None, labeled=False, **kwargs):
     """
     Calculate a set of IDT curves with one mechanism and mixture
+
+    Returns an array indexed (P, T).
     """
 
-    # storage array for results
-    IgnDelays = np.empty((len(Prange), len(Trange)))
+    curves = [(gas, P, X) for P in Prange]
+    coords = {"P": Prange, "T": Trange}
 
-    #calculate ignition delays
-    for q, P in enumerate(Prange):
-        IgnDelays[q,:] = idt_sweep_T(gas, Trange, P, X)
-    
-    return IgnDelays
+    return _sweep(curves, Trange, "PT", coords, max_workers, chunksize, labeled, kwargs)
 
-def idt_sweep_TX(gas, Trange, P, Xlist):
+def idt_sweep_TX(gas, Trange, P, Xlist, max_workers=1, chunksize=None, labeled=False, **kwargs):
     """
     Calculate a set of IDT curves for multiple mixtures at one pressure
+
+    Returns an array indexed (X, T).
     """
 
-    # storage array for results
-    IgnDelays = np.empty((len(Xlist), len(Trange)))
+    curves = [(gas, P, X) for X in Xlist]
+    coords = {"X": Xlist, "T": Trange}
 
-    #calculate ignition delays
-    for q, X in enumerate(Xlist):
-        IgnDelays[q,:] = idt_sweep_T(gas, Trange, P, X)
-    
-    return IgnDelays
+    return _sweep(curves, Trange, "XT", coords, max_workers, chunksize, labeled, kwargs)
 
-def idt_sweep_TM(MechList, Trange, P, X):
+def idt_sweep_TM(MechList, Trange, P, X, max_workers=1, chunksize=None, labeled=False, **kwargs):
     """
-    Calculate a set of IDT curves for multiple mixtures at one pressure
+    Calculate a set of IDT curves for multiple mechanisms at one pressure
+
+    Returns an array indexed (M, T).
     """
 
-    # storage array for results
-    IgnDelays = np.empty((len(MechList), len(Trange)))
+    curves = [(M, P, X) for M in MechList]
+    coords = {"M": MechList, "T": Trange}
 
-    #calculate ignition delays
-    for q, M in enumerate(MechList):
-        gas = ct.Solution(M)
-        IgnDelays[q,:] = idt_sweep_T(gas, Trange, P, X)
-    
-    return IgnDelays
+    return _sweep(curves, Trange, "MT", coords, max_workers, chunksize, labeled, kwargs)
 
-def idt_sweep_TPX(gas, Trange, Prange, Xlist):
+def idt_sweep_TPX(gas, Trange, Prange, Xlist, max_workers=1, chunksize=None, labeled=False, **kwargs):
     """
-    Calculate a set of IDT curves for multiple mixtures at one pressure
+    Calculate a set of IDT curves for multiple mixtures and pressures
+
+    Returns an array indexed (X, P, T).
     """
 
-    # storage array for results
-    IgnDelays = np.empty((len(Xlist), len(Prange), len(Trange)))
+    curves = [(gas, P, X) for X in Xlist for P in Prange]
+    coords = {"X": Xlist, "P": Prange, "T": Trange}
 
-    #calculate ignition delays
-    for q, X in enumerate(Xlist):
-        IgnDelays[q,:,:] = idt_sweep_TP(gas, Trange, Prange, X)
-    
-    return IgnDelays
+    return _sweep(curves, Trange, "XPT", coords, max_workers, chunksize, labeled, kwargs)
 
-def idt_sweep_TMX(MechList, Trange, P, Xlist):
+def idt_sweep_TMX(MechList, Trange, P, Xlist, max_workers=1, chunksize=None, labeled=False, **kwargs):
     """
     Calculate a set of IDT curves for multiple mixtures and mechanisms at one pressure
+
+    Returns an array indexed (X, M, T).
     """
 
-    # storage array for results
-    IgnDelays = np.empty((len(Xlist), len(MechList), len(Trange)))
+    curves = [(M, P, X) for X in Xlist for M in MechList]
+    coords = {"X": Xlist, "M": MechList, "T": Trange}
 
-    #calculate ignition delays
-    for q, X in enumerate(Xlist):
-        IgnDelays[q,:,:] = idt_sweep_TM(MechList, Trange, P, X)
-    
-    return IgnDelays
+    return _sweep(curves, Trange, "XMT", coords, max_workers, chunksize, labeled, kwargs)
 
-def idt_sweep_TPM(MechList, Trange, Prange, X):
+def idt_sweep_TPM(MechList, Trange, Prange, X, max_workers=1, chunksize=None, labeled=False, **kwargs):
     """
     Calculate a set of IDT curves one mixture with multiple mechanisms and pressures
+
+    Returns an array indexed (M, P, T).
     """
 
-    # storage array for results
-    IgnDelays = np.empty((len(Xlist), len(MechList), len(Trange)))
+    curves = [(M, P, X) for M in MechList for P in Prange]
+    coords = {"M": MechList, "P": Prange, "T": Trange}
 
-    #calculate ignition delays
-    for q, M in enumerate(MechList):
-        gas = ct.Solution(M)
-        IgnDelays[q,:,:] = idt_sweep_TP(gas, Trange, Prange, X)
-    
-    return IgnDelays
+    return _sweep(curves, Trange, "MPT", coords, max_workers, chunksize, labeled, kwargs)
 
-def idt_sweep_TMXP(MechList, Trange, Prange, X):
+def idt_sweep_TMXP(MechList, Trange, Prange, Xlist, max_workers=1, chunksize=None, labeled=False, **kwargs):
     """
     Calculate an arbitrary set of IDT curves
+
+    Returns an array indexed (P, X, M, T).
+    """
+
+    curves = [(M, P, X) for P in Prange for X in Xlist for M in MechList]
+    coords = {"P": Prange, "X": Xlist, "M": MechList, "T": Trange}
+
+    return _sweep(curves, Trange, "PXMT", coords, max_workers, chunksize, labeled, kwargs)
+
+def idt_points(gas, Tlist, Plist, X, max_workers=1, chunksize=None, **kwargs):
     """
+    Calculate IDTs at paired (T, P) conditions, e.g. the T5/P5 of a set of
+    shock tube experiments from reflected_shock.reflected_shock.
+    X is one mixture for all points or one per point.
+
+    Returns an array indexed like Tlist.
+    """
+
+    Tlist = np.asarray(Tlist, dtype=float)
+    Plist = np.broadcast_to(np.asarray(Plist, dtype=float), Tlist.shape).ravel()
+    if isinstance(X, (str, dict)):
+        Xlist = [X] * len(Plist)
+    else:
+        Xlist = list(X)
+    curves = [(gas, P, Xi) for P, Xi in zip(Plist, Xlist)]
+
+    # one single-temperature curve per point
+    IgnDelays = run_curves(ignition_delay, curves, Tlist.reshape(-1, 1),
+                           max_workers, chunksize, **kwargs)
 
-    # storage array for results
-    IgnDelays = np.empty((len(Prange), len(Xlist), len(MechList), len(Trange)))
+    return IgnDelays.reshape(Tlist.shape)
 
-    #calculate ignition delays
-    for q, P in enumerate(Prange):
-        IgnDelays[q,:,:,:] = idt_sweep_TMX(gas, Trange, Prange, X)
-    
-    return IgnDelays
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""
+Copyright 2021 Mark E. Fuller
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import numpy as np
+import pandas as pd
+
+# CVODES counters copied into every record
+SOLVER_STATS = ("rhs_evals", "jac_evals", "err_test_fails", "nonlinear_conv_fails",
+                "lin_solve_setups")
+
+
+def point_record(T, P, tau, seconds, steps, retries, network=None, cached=False):
+    """
+    Profiling record of one ignition_delay call. steps counts integrator
+    steps; retries counts widenings of the integration window; solver
+    statistics are taken from the reactor network, if given.
+    """
+    record = {"T": T, "P": P, "tau": tau, "seconds": seconds, "steps": steps,
+              "retries": retries, "cached": cached}
+    stats = getattr(network, "solver_stats", None) or {}
+    for k in SOLVER_STATS:
+        record[k] = stats.get(k)
+    return record
+
+
+class Profiler:
+    """
+    Collector of per-point profiling records.
+
+    Pass profile=Profiler() to ignition_delay or to any sweep; nothing is
+    measured without it. Sweeps add the curve and point index to each
+    record; records from worker processes are collected by the parent.
+    Each hook is called with every record as it arrives, e.g.
+    Profiler(hooks=[lambda rec: logger.info("%s", rec)]).
+    """
+
+    def __init__(self, hooks=()):
+        self.records = []
+        self.hooks = list(hooks)
+
+    def __call__(self, record):
+        self.records.append(record)
+        for hook in self.hooks:
+            hook(record)
+
+    def clear(self):
+        self.records = []
+
+    def to_dataframe(self):
+        return pd.DataFrame(self.records)
+
+    def slowest(self, n=5):
+        """
+        The n slowest points as a DataFrame.
+        """
+        df = self.to_dataframe()
+        if df.empty:
+            return df
+        return df.sort_values("seconds", ascending=False).head(n)
+
+    def summary(self):
+        """
+        Totals over all records, mean and maximum time per point, and the
+        number of points slower than 10x the median.
+        """
+        seconds = np.array([r["seconds"] for r in self.records], dtype=float)
+        out = {"points": len(seconds)}
+        if len(seconds) == 0:
+            return out
+        out["cached"] = sum(bool(r["cached"]) for r in self.records)
+        out["seconds"] = float(seconds.sum())
+        out["mean_seconds"] = float(seconds.mean())
+        out["max_seconds"] = float(seconds.max())
+        out["slow_points"] = int(np.sum(seconds > 10.0 * np.median(seconds)))
+        for k in ("steps", "retries") + SOLVER_STATS:
+            out[k] = sum(r[k] for r in self.records if r.get(k) is not None)
+        return out
@@ -0,0 +1,169 @@
+"""
+Copyright 2021 Mark E. Fuller
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+from collections import OrderedDict, namedtuple
+
+import cantera as ct
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "currsize", "nbytes"])
+
+# rough memory footprint of a loaded Solution per species and per reaction
+BYTES_PER_SPECIES = 4096
+BYTES_PER_REACTION = 4096
+
+
+def resolve_mechanism(mech):
+    """
+    Absolute path of a mechanism file, searching the Cantera data
+    directories for bare names like 'gri30.yaml'. Returns mech unchanged
+    if no file is found.
+    """
+    if os.path.isfile(mech):
+        return os.path.abspath(mech)
+    for d in ct.get_data_directories():
+        candidate = os.path.join(d, mech)
+        if os.path.isfile(candidate):
+            return os.path.abspath(candidate)
+    return mech
+
+
+def mechanism_key(mech, name=None):
+    """
+    Cache key: (path, modification time, size, phase name).
+    Editing the file on disk changes the key.
+    """
+    path = resolve_mechanism(mech)
+    try:
+        st = os.stat(path)
+        return (path, st.st_mtime_ns, st.st_size, name)
+    except OSError:
+        return (path, None, None, name)
+
+
+def estimate_nbytes(gas):
+    """
+    Approximate memory held by a Solution object.
+    """
+    return BYTES_PER_SPECIES * gas.n_species + BYTES_PER_REACTION * gas.n_reactions
+
+
+class MechanismCache:
+    """
+    LRU cache of Cantera Solution objects keyed by mechanism_key.
+
+    Entries are evicted least-recently-used first once more than maxsize
+    mechanisms are held or their estimated memory exceeds max_bytes; the most
+    recent entry is always kept. Cached Solutions are shared, so callers must
+    set the state they need (and reset any rate multipliers they change).
+    Each entry also holds the reactor engines built for its Solution (see
+    engine.engine_for), which are dropped with it.
+    """
+
+    def __init__(self, maxsize=8, max_bytes=2 * 1024**3):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        # mechanism_key of each cached Solution, by id()
+        self._keys = {}
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, mech, name=None):
+        """
+        Solution for mechanism file mech (and optional phase name).
+        """
+        key = mechanism_key(mech, name)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+        self.misses += 1
+        gas = ct.Solution(mech, name) if name else ct.Solution(mech)
+        size = estimate_nbytes(gas)
+        self._entries[key] = (gas, size, {})
+        self._keys[id(gas)] = key
+        self.nbytes += size
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.maxsize or self.nbytes > self.max_bytes
+        ):
+            _, (old, oldsize, _) = self._entries.popitem(last=False)
+            del self._keys[id(old)]
+            self.nbytes -= oldsize
+            self.evictions += 1
+        return gas
+
+    def engines(self, gas):
+        """
+        Dict of engines stored with gas, or None if gas is not cached.
+        """
+        entry = self._entries.get(self._keys.get(id(gas)))
+        if entry is None or entry[0] is not gas:
+            return None
+        return entry[2]
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.evictions,
+                         len(self._entries), self.nbytes)
+
+    def clear(self):
+        """
+        Drop all entries and reset the counters.
+        """
+        self._entries.clear()
+        self._keys.clear()
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+
+# per-process cache used by the sweep functions and pool workers
+_cache = MechanismCache()
+
+
+def get_solution(mech, name=None):
+    """
+    Solution for mech from the per-process cache.
+    """
+    return _cache.get(mech, name)
+
+
+def cached_engines(gas):
+    """
+    Engines stored with gas in the per-process cache, or None if gas did
+    not come from it.
+    """
+    return _cache.engines(gas)
+
+
+def cache_info():
+    """
+    Hit/miss counters of the per-process cache (this process only).
+    """
+    return _cache.cache_info()
+
+
+def configure_cache(maxsize=None, max_bytes=None):
+    """
+    Change the limits of the per-process cache.
+    """
+    if maxsize is not None:
+        _cache.maxsize = maxsize
+    if max_bytes is not None:
+        _cache.max_bytes = max_bytes
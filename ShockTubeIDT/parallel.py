@@ -0,0 +1,369 @@
+"""
+Copyright 2021 Mark E. Fuller
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cantera as ct
+import numpy as np
+
+from .checkpoint import Checkpoint, point_keys
+from .detection import record_dtype
+from .engine import engine_for
+from .horizon import HorizonEstimator
+from .mechanism_cache import get_solution
+from .scheduling import longest_first
+
+# (rtol, atol) tried in turn, after the engine's own tolerances, when the
+# integrator fails at a point of a warmStart sweep; only those tighter than
+# the engine's are used. The first entry is the Cantera default.
+TOLERANCES = ((1e-9, 1e-15), (1e-10, 1e-16), (1e-12, 1e-18))
+
+
+def mechanism_spec(mech):
+    """
+    Picklable (input file, phase name) identifying a mechanism.
+    mech may be a Cantera Solution or a mechanism file name.
+    """
+    if isinstance(mech, tuple):
+        return mech
+    if isinstance(mech, str):
+        return (mech, None)
+    source = getattr(mech, "source", None)
+    if not source or not os.path.splitext(source)[1]:
+        raise ValueError(
+            "Cannot rebuild this Solution in a worker process; "
+            "pass the mechanism file name instead"
+        )
+    return (source, mech.name)
+
+
+def _multipliers(gas):
+    """
+    Non-unit rate multipliers of gas as {reaction index: multiplier}.
+    """
+    return {i: m for i, m in enumerate(map(gas.multiplier, range(gas.n_reactions)))
+            if m != 1.0}
+
+
+def _history_files(template, curves, Tgrid):
+    """
+    History file name of every point of a sweep from a template with the
+    fields T, P, X, M (mechanism file name without extension), curve and
+    point (indices in the sweep). Raises ValueError if the names are not
+    unique.
+    """
+    names = np.empty(Tgrid.shape, dtype=object)
+    for c, (mech, P, X) in enumerate(curves):
+        if isinstance(mech, tuple):
+            mech = mech[0]
+        if isinstance(mech, ct.Solution):
+            mech = getattr(mech, "source", None) or mech.name
+        M = os.path.splitext(os.path.basename(mech))[0]
+        for q, T in enumerate(Tgrid[c]):
+            name = template.format(T=T, P=P, X=X, M=M, curve=c, point=q)
+            # ignition_delay formats the name again with T and P
+            names[c, q] = name.replace("{", "{{").replace("}", "}}")
+    if len(set(names.ravel())) < names.size:
+        raise ValueError(
+            f"historyFile {template!r} gives several points of the sweep the same "
+            "file; add fields such as {X}, {M} or {curve} and {point}"
+        )
+    return names
+
+
+def _result_dtype(kwargs):
+    """
+    float, or a structured dtype when several IDT definitions are requested.
+    """
+    definitions = kwargs.get("definitions")
+    return float if definitions is None else record_dtype(definitions)
+
+
+def _as_record(value):
+    # dicts of tau per definition are stored as structured records
+    return tuple(value.values()) if isinstance(value, dict) else value
+
+
+def _plain(value):
+    # JSON-friendly form of a stored result (float or dict per definition)
+    if isinstance(value, np.void):
+        return {name: float(value[name]) for name in value.dtype.names}
+    return float(value)
+
+
+def _tolerance_ladder(network):
+    """
+    The (rtol, atol) of network followed by the entries of TOLERANCES
+    that are tighter in both.
+    """
+    current = (network.rtol, network.atol)
+    return [current] + [(r, a) for r, a in TOLERANCES if r < current[0] and a < current[1]]
+
+
+def _solve_tightening(func, gas, kwargs, ladder, rung):
+    """
+    func(gas, **kwargs) starting from tolerance set `rung` of ladder and
+    tightening it if the integrator fails. Returns (value, rung that worked).
+    """
+    network = kwargs["engine"].network
+    state = gas.state
+    while True:
+        network.rtol, network.atol = ladder[rung]
+        try:
+            return _as_record(func(gas, **kwargs)), rung
+        except ct.CanteraError:
+            if rung == len(ladder) - 1:
+                raise
+            rung += 1
+            gas.state = state
+
+
+def _run_temps(func, gas, P, X, temps, adaptiveHorizon, kwargs, onPoint=None,
+               profile=None, warmStart=False, historyFiles=None):
+    """
+    IDTs for consecutive temperatures of one curve on one Solution.
+    With adaptiveHorizon, each point gets a horizon predicted from the
+    points before it (see horizon.HorizonEstimator). The reactor network
+    of the gas is reused between points (see engine.engine_for).
+
+    warmStart carries information along the curve: points run from hot to
+    cold so that each follows its nearest neighbour, horizons are predicted
+    as with adaptiveHorizon, and if the integrator fails the tolerances are
+    tightened (see TOLERANCES) and kept for the following points. The
+    integrator itself restarts at every point, as Cantera offers no initial
+    step size to carry over; the engine's tolerances are restored after.
+
+    onPoint(q, value, seconds) is called after each point, and
+    profile(q, record) with the profiling record of each point, if given.
+    historyFiles holds the historyFile of each point.
+    """
+    out = np.empty(len(temps), dtype=_result_dtype(kwargs))
+    times = np.empty(len(temps))
+    engine = engine_for(gas, kwargs.get("mode", "UV"))
+    kwargs["engine"] = engine
+    order = range(len(temps))
+    if warmStart:
+        adaptiveHorizon = True
+        order = np.argsort(-np.asarray(temps), kind="stable")
+        ladder = _tolerance_ladder(engine.network)
+        rung = 0
+    if adaptiveHorizon:
+        estimator = HorizonEstimator(maxTime=kwargs.get("endTime", 1.0))
+    try:
+        for q in order:
+            T = temps[q]
+            gas.TPX = T, P, X
+            if adaptiveHorizon:
+                kwargs["horizon"] = estimator.predict(T)
+            if profile is not None:
+                kwargs["profile"] = lambda record, q=q: profile(q, record)
+            if historyFiles is not None:
+                kwargs["historyFile"] = historyFiles[q]
+            start = time.perf_counter()
+            if warmStart:
+                out[q], rung = _solve_tightening(func, gas, kwargs, ladder, rung)
+            else:
+                out[q] = _as_record(func(gas, **kwargs))
+            times[q] = time.perf_counter() - start
+            if adaptiveHorizon:
+                estimator.add(T, out[q] if out.dtype.names is None else out[q][0])
+            if onPoint is not None:
+                onPoint(q, out[q], times[q])
+    finally:
+        if warmStart:
+            engine.network.rtol, engine.network.atol = ladder[0]
+    return out, times
+
+
+def _run_chunk(func, spec, P, X, temps, adaptiveHorizon, kwargs, profiled=False,
+               warmStart=False, historyFiles=None, multipliers=None):
+    """
+    Worker task: IDTs for consecutive temperatures of one curve, and the
+    profiling records of its points as (q, record) if profiled. The rate
+    multipliers of the caller's Solution are applied for the task.
+    """
+    records = []
+    profile = (lambda q, record: records.append((q, record))) if profiled else None
+    gas = get_solution(*spec)
+    gas.set_multiplier(1.0)
+    for i, m in (multipliers or {}).items():
+        gas.set_multiplier(m, i)
+    try:
+        values, seconds = _run_temps(func, gas, P, X, temps, adaptiveHorizon, kwargs,
+                                     profile=profile, warmStart=warmStart,
+                                     historyFiles=historyFiles)
+    finally:
+        gas.set_multiplier(1.0)
+    return values, seconds, records
+
+
+def run_curves(func, curves, Trange, max_workers=1, chunksize=None,
+               adaptiveHorizon=False, return_times=False, checkpoint=None, schedule=None,
+               warmStart=False, **kwargs):
+    """
+    Evaluate func(gas, **kwargs) at every temperature of every curve.
+
+    curves is a sequence of (mech, P, X) where mech is a Solution or
+    mechanism file name. Trange is shared by all curves, or a 2-D array with
+    one row of temperatures per curve. Returns an array of shape
+    (len(curves), number of temperatures);
+    if a list of IDT definitions is passed, it is a structured array with one
+    field per definition, e.g. IgnDelays["OH"].
+
+    With max_workers=1 the points run serially in this process, using the
+    Solution objects as passed. Otherwise the points are split into chunks of
+    consecutive temperatures and run in a process pool (max_workers=None
+    uses all cores). Mechanism files are loaded through the per-process
+    mechanism cache, so each worker parses a mechanism only once; rate
+    multipliers set on a Solution passed in are applied in the workers too.
+    Results are returned in the same order regardless of scheduling.
+
+    adaptiveHorizon=True predicts each point's integration horizon from a
+    running Arrhenius fit of the preceding points of its curve (or chunk).
+    warmStart=True also runs each curve (or chunk) from hot to cold and
+    tightens the solver tolerances for the rest of it after a failed point
+    (see _run_temps); it is a continuation along the curve, not a restart of
+    the integrator from the previous solution.
+
+    checkpoint is the path of an append-only log (see checkpoint.Checkpoint)
+    to which completed points are written as they finish. If the file exists,
+    points already in it (same mechanism contents, P, X, T and settings) are
+    not computed again, so an interrupted or edited sweep resumes.
+
+    return_times=True also returns the wall time of each point:
+    (IgnDelays, solveTimes).
+
+    schedule is a scheduling.CostModel. Points are then dispatched one at a
+    time in order of decreasing predicted cost, so the longest points start
+    first and idle workers pick up the remainder; measured times update the
+    model, which is saved at the end. Points of a curve no longer run
+    consecutively in one process, so adaptiveHorizon and warmStart have no
+    effect then.
+
+    profile (see instrument.Profiler) receives the record of every point,
+    tagged with its curve and point index, also from worker processes.
+
+    historyFile is a name template formatted for every point with T, P, X,
+    M (mechanism file name without extension), curve and point, e.g.
+    "hist/{M}-{curve}-{T:.0f}K.npy"; it must give every point its own file.
+    """
+    Tgrid = np.asarray(Trange, dtype=float)
+    if Tgrid.ndim == 1:
+        Tgrid = np.broadcast_to(Tgrid, (len(curves), len(Tgrid)))
+    nT = Tgrid.shape[1]
+    IgnDelays = np.empty((len(curves), nT), dtype=_result_dtype(kwargs))
+    solveTimes = np.empty((len(curves), nT))
+    profile = kwargs.pop("profile", None)
+    files = None
+    if kwargs.get("historyFile") is not None:
+        files = _history_files(kwargs.pop("historyFile"), curves, Tgrid)
+
+    # changed rates key the checkpoint and are sent to the pool workers,
+    # which load a clean Solution
+    rates = [_multipliers(mech) if isinstance(mech, ct.Solution) else None
+             for mech, P, X in curves]
+    log = None
+    todo = [np.arange(nT) for _ in curves]
+    if checkpoint is not None:
+        keys = point_keys([(mechanism_spec(m), P, X) for m, P, X in curves], Tgrid, kwargs,
+                          rates)
+        log = Checkpoint(checkpoint)
+        for c, q in np.ndindex(keys.shape):
+            if keys[c, q] in log.done:
+                value, seconds = log.done[keys[c, q]]
+                IgnDelays[c, q] = _as_record(value)
+                solveTimes[c, q] = seconds
+        todo = [np.array([q for q in idx if keys[c, q] not in log.done], dtype=int)
+                for c, idx in enumerate(todo)]
+
+    try:
+        if max_workers == 1:
+            for c, (mech, P, X) in enumerate(curves):
+                if len(todo[c]) == 0:
+                    continue
+                if isinstance(mech, ct.Solution):
+                    gas = mech
+                else:
+                    gas = get_solution(*mechanism_spec(mech))
+                idx = todo[c]
+                onPoint = None
+                if log is not None:
+                    def onPoint(q, value, seconds, c=c, idx=idx):
+                        log.write(keys[c, idx[q]], _plain(value), seconds)
+                tagged = None
+                if profile is not None:
+                    def tagged(q, record, c=c, idx=idx):
+                        profile(dict(record, curve=c, point=int(idx[q])))
+                IgnDelays[c, idx], solveTimes[c, idx] = _run_temps(
+                    func, gas, P, X, Tgrid[c, idx], adaptiveHorizon, kwargs, onPoint, tagged,
+                    warmStart, None if files is None else files[c, idx])
+                if schedule is not None:
+                    schedule.update(mech, Tgrid[c, idx], solveTimes[c, idx])
+            if schedule is not None:
+                schedule.save()
+            return (IgnDelays, solveTimes) if return_times else IgnDelays
+
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if chunksize is None:
+            # a few chunks per worker evens out the load
+            npoints = sum(len(idx) for idx in todo)
+            chunksize = max(1, math.ceil(npoints / (4 * max_workers)))
+
+        specs = [mechanism_spec(mech) for mech, P, X in curves]
+        tasks = []
+        if schedule is not None:
+            for c, q in longest_first(schedule, curves, Tgrid, todo):
+                tasks.append((c, np.array([q]), specs[c], curves[c][1], curves[c][2]))
+        else:
+            for c, (mech, P, X) in enumerate(curves):
+                idx = todo[c]
+                if warmStart:
+                    # chunks of neighbouring temperatures
+                    idx = idx[np.argsort(-Tgrid[c, idx], kind="stable")]
+                for start in range(0, len(idx), chunksize):
+                    tasks.append((c, idx[start : start + chunksize], specs[c], P, X))
+
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(_run_chunk, func, spec, P, X, Tgrid[c, idx],
+                            adaptiveHorizon, kwargs, profile is not None, warmStart,
+                            None if files is None else files[c, idx], rates[c]): (c, idx)
+                for c, idx, spec, P, X in tasks
+            }
+            # placement is by index, so completion order does not matter
+            for future in as_completed(futures):
+                c, idx = futures[future]
+                values, seconds, records = future.result()
+                for q, record in records:
+                    profile(dict(record, curve=c, point=int(idx[q])))
+                IgnDelays[c, idx] = values
+                solveTimes[c, idx] = seconds
+                if schedule is not None:
+                    schedule.update(specs[c], Tgrid[c, idx], seconds)
+                if log is not None:
+                    for q, value, sec in zip(idx, values, seconds):
+                        log.write(keys[c, q], _plain(value), float(sec))
+        if schedule is not None:
+            schedule.save()
+    finally:
+        if log is not None:
+            log.close()
+
+    return (IgnDelays, solveTimes) if return_times else IgnDelays
@@ -0,0 +1,278 @@
+"""
+Copyright 2021 Mark E. Fuller
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+
+import cantera as ct
+import numpy as np
+
+from .ignition_delay import ignition_delay
+from .mechanism_cache import get_solution
+from .parallel import mechanism_spec
+from .result_cache import mechanism_hash
+
+# species never used as DRGEP targets
+INERTS = ("AR", "Ar", "HE", "He", "N2")
+
+# ignition_delay options that do not affect the IDT
+_IGNORED = ("gas", "cache", "engine", "profile", "history", "historyFile", "historySpecies",
+            "historyInterval")
+_SETTINGS = [k for k in inspect.signature(ignition_delay).parameters if k not in _IGNORED]
+
+
+def _load(mech):
+    if isinstance(mech, ct.Solution):
+        return mech
+    return get_solution(*mechanism_spec(mech))
+
+
+def sample_states(gas, T, P, X, stop, nSamples=40, mode="UV"):
+    """
+    States along the ignition of one mixture up to time stop, thinned to
+    about nSamples rows of [T, P, X...]. mode "HP" samples at constant
+    pressure, any other mode at constant volume.
+    """
+    gas.TPX = T, P, X
+    if mode == "HP":
+        r = ct.IdealGasConstPressureReactor(gas, name="Sampling Reactor")
+    else:
+        r = ct.IdealGasReactor(gas, name="Sampling Reactor")
+    net = ct.ReactorNet([r])
+    phase = getattr(r, "phase", None) or r.thermo
+    rows = [np.hstack((T, P, gas.X))]
+    t = 0.0
+    while t < stop:
+        t = net.step()
+        Tr, Pr, Xr = phase.TPX
+        rows.append(np.hstack((Tr, Pr, Xr)))
+    rows = np.array(rows)
+    keep = np.unique(np.linspace(0, len(rows) - 1, nSamples).astype(int))
+    return rows[keep]
+
+
+def _taus(gas, points, kwargs):
+    """
+    IDTs at every (T, P, X), one column per IDT definition.
+    """
+    taus = []
+    for T, P, X in points:
+        gas.TPX = T, P, X
+        tau = ignition_delay(gas, **kwargs)
+        if isinstance(tau, dict):
+            tau = list(tau.values())
+        tau = np.asarray(tau)
+        if tau.dtype.names is not None:
+            tau = np.array([tau[k] for k in tau.dtype.names], dtype=float)
+        taus.append(np.atleast_1d(tau).astype(float))
+    return np.array(taus)
+
+
+def interaction_coefficients(gas):
+    """
+    DRGEP direct interaction coefficients r[A, B] at the current state:
+    the share of the production or consumption of A due to reactions
+    involving B.
+    """
+    nu = gas.product_stoich_coeffs - gas.reactant_stoich_coeffs
+    involved = ((gas.product_stoich_coeffs != 0) | (gas.reactant_stoich_coeffs != 0))
+    rates = nu * gas.net_rates_of_progress
+    production = np.maximum(rates, 0.0).sum(axis=1)
+    consumption = np.maximum(-rates, 0.0).sum(axis=1)
+    scale = np.maximum(production, consumption)
+    scale[scale == 0.0] = np.inf
+    return np.abs(rates @ involved.T.astype(float)) / scale[:, np.newaxis]
+
+
+def _path_coefficients(r, target):
+    """
+    Largest product of direct coefficients along any path from target
+    (a max-product variant of Dijkstra's algorithm).
+    """
+    R = np.zeros(len(r))
+    R[target] = 1.0
+    done = np.zeros(len(r), dtype=bool)
+    while True:
+        candidates = np.where(done, -1.0, R)
+        u = int(np.argmax(candidates))
+        if candidates[u] <= 0.0:
+            return R
+        done[u] = True
+        np.maximum(R, R[u] * r[u], out=R, where=~done)
+
+
+def species_importance(gas, states, targets):
+    """
+    Overall DRGEP importance of every species: the maximum over sampled
+    states and targets of the path coefficients.
+    """
+    state = gas.state
+    ks = [gas.species_index(k) for k in targets]
+    importance = np.zeros(gas.n_species)
+    for row in states:
+        gas.TPX = row[0], row[1], row[2:]
+        r = interaction_coefficients(gas)
+        for k in ks:
+            np.maximum(importance, _path_coefficients(r, k), out=importance)
+    importance[ks] = 1.0
+    gas.state = state
+    return importance
+
+
+def skeletal_solution(gas, species):
+    """
+    Solution with the given species and the reactions among them.
+    """
+    keep = set(species)
+    reactions = []
+    for r in gas.reactions():
+        if not (set(r.reactants) <= keep and set(r.products) <= keep):
+            continue
+        if r.third_body is not None and r.third_body.name not in keep | {"M"}:
+            continue
+        # new Reaction objects, so the full mechanism is not modified
+        data = dict(r.input_data)
+        if "efficiencies" in data:
+            data["efficiencies"] = {k: v for k, v in data["efficiencies"].items()
+                                    if k in keep}
+        reactions.append(ct.Reaction.from_dict(data, gas))
+    ordered = [k for k in gas.species_names if k in keep]
+    return ct.Solution(thermo="ideal-gas", kinetics="gas", name=gas.name,
+                       species=[gas.species(k) for k in ordered], reactions=reactions)
+
+
+def _envelope_key(mech, name, points, targets, tolerance, kwargs):
+    record = {
+        "mechanism": mechanism_hash(mech, name),
+        "points": [[float(T), float(P), str(X)] for T, P, X in points],
+        "targets": sorted(targets),
+        "tolerance": tolerance,
+        "settings": kwargs,
+    }
+    text = json.dumps(record, sort_keys=True, default=repr)
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def reduce_mechanism(mech, points, tolerance=0.1, targets=None, cacheDir=None,
+                     nSamples=40, **kwargs):
+    """
+    DRGEP skeletal mechanism that reproduces the IDTs of the full one to
+    within a relative `tolerance` at every (T, P, X) in points.
+
+    States sampled along the ignition at each point rank the species by
+    their importance to the targets (default: the non-inert species of
+    the mixtures). The largest importance threshold whose skeletal
+    mechanism meets the tolerance is found by bisection. Species present in
+    a mixture are always kept. Keyword arguments are passed to
+    ignition_delay for the IDT comparisons; those that do not change the IDT
+    (cache, profile, history...) and sweep options are ignored.
+
+    The result is written to cacheDir (default ~/.cache/ShockTubeIDT) as a
+    YAML file named by the mechanism hash and the envelope, and read from
+    there on later calls. The full mechanism is left untouched.
+    Returns the skeletal Solution, loaded from that file.
+    """
+    kwargs = {k: v for k, v in kwargs.items() if k in _SETTINGS}
+    gas = _load(mech)
+    source, name = mechanism_spec(gas)
+    points = [(float(T), float(P), X) for T, P, X in points]
+
+    state = gas.state
+    mixtures = []
+    for T, P, X in points:
+        gas.TPX = T, P, X
+        mixtures.append(gas.X.copy())
+    present = np.flatnonzero(np.max(mixtures, axis=0) > 0.0)
+    if targets is None:
+        targets = [gas.species_name(k) for k in present
+                   if gas.species_name(k) not in INERTS]
+
+    if cacheDir is None:
+        cacheDir = os.path.join(os.path.expanduser("~"), ".cache", "ShockTubeIDT")
+    key = _envelope_key(source, name, points, targets, tolerance, kwargs)
+    base = os.path.splitext(os.path.basename(source))[0]
+    path = os.path.join(cacheDir, f"{base}-skeletal-{key}.yaml")
+    if os.path.exists(path):
+        gas.state = state
+        return get_solution(path)
+
+    taus = _taus(gas, points, kwargs)
+    states = []
+    endTime = kwargs.get("endTime", 1.0)
+    for (T, P, X), tau in zip(points, taus):
+        last = np.nanmax(tau, initial=-np.inf)
+        stop = 2.0 * last if np.isfinite(last) else endTime
+        states.append(sample_states(gas, T, P, X, stop, nSamples, kwargs.get("mode", "UV")))
+    importance = species_importance(gas, np.vstack(states), targets)
+    importance[present] = 1.0
+    gas.state = state
+
+    def error(threshold):
+        skeletal = skeletal_solution(gas, [gas.species_name(k)
+                                           for k in np.flatnonzero(importance >= threshold)])
+        taus_s = _taus(skeletal, points, kwargs)
+        if np.any(np.isnan(taus) != np.isnan(taus_s)):
+            return np.inf, skeletal
+        return np.nanmax(np.abs(taus_s / taus - 1.0), initial=0.0), skeletal
+
+    # thresholds between distinct importances, from most to least reduced
+    thresholds = np.unique(importance)[::-1]
+    lo, hi = 0, len(thresholds) - 1
+    best = None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        err, skeletal = error(thresholds[mid])
+        if err <= tolerance:
+            best = skeletal
+            hi = mid - 1
+        else:
+            lo = mid + 1
+    if best is None:
+        best = skeletal_solution(gas, gas.species_names)
+
+    os.makedirs(cacheDir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp.yaml"
+    best.write_yaml(tmp)
+    os.replace(tmp, path)
+    return get_solution(path)
+
+
+def reduce_curves(curves, Trange, tolerance=0.1, **kwargs):
+    """
+    Replace the mechanism of every sweep curve (mech, P, X) by a skeletal
+    mechanism for the envelope of its curves: the lowest, middle and
+    highest temperature at each pressure and mixture used with it.
+    Returns (curves, {full mechanism: skeletal file}).
+    """
+    Tgrid = np.asarray(Trange, dtype=float)
+    Tlow, Thigh = np.min(Tgrid), np.max(Tgrid)
+    temps = np.unique([Tlow, 0.5 * (Tlow + Thigh), Thigh])
+    options = {k: kwargs.pop(k) for k in ("targets", "cacheDir", "nSamples") if k in kwargs}
+
+    envelopes = {}
+    for mech, P, X in curves:
+        key = mechanism_spec(mech)
+        envelopes.setdefault(key, (mech, []))[1].extend((T, P, X) for T in temps)
+
+    reduced = {}
+    for key, (mech, points) in envelopes.items():
+        unique = list({(T, P, str(X)): (T, P, X) for T, P, X in points}.values())
+        reduced[key] = reduce_mechanism(mech, unique, tolerance, **options, **kwargs).source
+
+    new = [(reduced[mechanism_spec(mech)], P, X) for mech, P, X in curves]
+    return new, {str(k[0]): v for k, v in reduced.items()}
@@ -0,0 +1,167 @@
+"""
+Copyright 2021 Mark E. Fuller
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from collections import namedtuple
+
+import cantera as ct
+import numpy as np
+
+ShockConditions = namedtuple("ShockConditions", ["T2", "P2", "T5", "P5", "up", "uR"])
+ShockConditions.__doc__ = """
+Frozen-chemistry shock tube conditions: behind the incident shock (T2, P2),
+behind the reflected shock (T5, P5), the lab-frame gas velocity behind the
+incident shock up and the reflected shock velocity uR.
+"""
+
+
+class FrozenThermo:
+    """
+    Mass-specific enthalpy and heat capacity of a fixed composition,
+    vectorized over temperature arrays.
+
+    NASA 7-coefficient polynomials are evaluated directly; other species
+    parameterizations are tabulated once on a 1 K grid and interpolated.
+    """
+
+    def __init__(self, gas, X, Tmin=200.0, Tmax=6000.0):
+        state = gas.state
+        gas.TPX = 300.0, ct.one_atm, X
+        x = gas.X.copy()
+        self.W = gas.mean_molecular_weight
+        gas.state = state
+        self.R = ct.gas_constant / self.W
+
+        self._nasa = []
+        grid = np.arange(Tmin, Tmax + 1.0)
+        self._grid = grid
+        self._htab = np.zeros_like(grid)
+        self._cptab = np.zeros_like(grid)
+        for k in np.flatnonzero(x):
+            thermo = gas.species(int(k)).thermo
+            if isinstance(thermo, ct.NasaPoly2):
+                c = thermo.coeffs
+                self._nasa.append((x[k], c[0], c[1:8], c[8:15]))
+            else:
+                self._htab += x[k] * np.array([thermo.h(T) for T in grid])
+                self._cptab += x[k] * np.array([thermo.cp(T) for T in grid])
+
+    def _poly(self, T, a):
+        # h/R and cp/R of one NASA7 range
+        hR = T * (a[0] + T * (a[1] / 2 + T * (a[2] / 3 + T * (a[3] / 4 + T * a[4] / 5)))) + a[5]
+        cpR = a[0] + T * (a[1] + T * (a[2] + T * (a[3] + T * a[4])))
+        return hR, cpR
+
+    def h_cp(self, T):
+        """
+        (h, cp) in J/kg and J/kg/K at temperatures T.
+        """
+        T = np.asarray(T, dtype=float)
+        H = np.interp(T, self._grid, self._htab)
+        Cp = np.interp(T, self._grid, self._cptab)
+        for x, Tmid, high, low in self._nasa:
+            hh, cph = self._poly(T, high)
+            hl, cpl = self._poly(T, low)
+            hi = T >= Tmid
+            H = H + x * ct.gas_constant * np.where(hi, hh, hl)
+            Cp = Cp + x * ct.gas_constant * np.where(hi, cph, cpl)
+        return H / self.W, Cp / self.W
+
+
+def _jump(thermo, T_a, P_a, inflow, r0, tol=1e-12, maxiter=50):
+    """
+    Solve the normal shock jump from state a for the density ratio r = rho_b/rho_a.
+
+    inflow(r) returns the gas velocity entering the shock (shock frame).
+    Newton iterations on the energy equation run on whole arrays at once;
+    the derivative is taken by a forward difference in r.
+    """
+    rho_a = P_a / (thermo.R * T_a)
+    h_a, _ = thermo.h_cp(T_a)
+
+    def state(r):
+        w = inflow(r)
+        P_b = P_a + rho_a * w**2 * (1.0 - 1.0 / r)
+        T_b = P_b / (r * rho_a * thermo.R)
+        h_b, _ = thermo.h_cp(T_b)
+        return h_b - h_a - 0.5 * w**2 * (1.0 - 1.0 / r**2), T_b, P_b
+
+    r = np.array(r0, dtype=float)
+    for _ in range(maxiter):
+        f, T_b, P_b = state(r)
+        dr = 1e-7 * r
+        df = (state(r + dr)[0] - f) / dr
+        step = f / df
+        r = np.maximum(r - step, 1.0 + 1e-9)
+        if np.all(np.abs(step) <= tol * r):
+            break
+    f, T_b, P_b = state(r)
+    return r, T_b, P_b
+
+
+def reflected_shock(u1, T1, P1, X, gas):
+    """
+    Frozen-chemistry incident and reflected shock conditions for a batch of
+    experiments: measured incident shock velocity u1 (m/s), driven section
+    T1 (K) and P1 (Pa), and mixture X (one for all, or one per experiment).
+    Arrays are broadcast against each other; gas supplies species thermo.
+
+    Returns ShockConditions of arrays. T5 and P5 can be passed directly to
+    ignition_delay.idt_points.
+    """
+
+    u1, T1, P1 = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (u1, T1, P1)))
+    shape = u1.shape
+    u1, T1, P1 = u1.ravel(), T1.ravel(), P1.ravel()
+    n = len(u1)
+
+    if isinstance(X, (str, dict)):
+        mixtures = [X]
+        which = np.zeros(n, dtype=int)
+    else:
+        keys = [str(x) for x in X]
+        unique = list(dict.fromkeys(keys))
+        mixtures = [X[keys.index(k)] for k in unique]
+        which = np.array([unique.index(k) for k in keys])
+        if len(which) != n:
+            raise ValueError(f"{len(which)} mixtures for {n} experiments")
+
+    out = {k: np.empty(n) for k in ShockConditions._fields}
+    for m, mix in enumerate(mixtures):
+        sel = which == m
+        thermo = FrozenThermo(gas, mix)
+        u, Ta, Pa = u1[sel], T1[sel], P1[sel]
+
+        # perfect-gas estimates seed the Newton iterations
+        _, cp1 = thermo.h_cp(Ta)
+        g = cp1 / (cp1 - thermo.R)
+        Ms = u / np.sqrt(g * thermo.R * Ta)
+        r2 = (g + 1) * Ms**2 / ((g - 1) * Ms**2 + 2)
+
+        r2, T2, P2 = _jump(thermo, Ta, Pa, lambda r: u, r2)
+        up = u * (1.0 - 1.0 / r2)
+
+        MR = Ms / (Ms**2 - 1) * np.sqrt(1 + 2 * (g - 1) / (g + 1) ** 2 * (Ms**2 - 1) * (g + 1 / Ms**2))
+        MR = (1 + np.sqrt(1 + 4 * MR**2)) / (2 * MR)
+        r5 = (g + 1) * MR**2 / ((g - 1) * MR**2 + 2)
+
+        # gas 2 enters the reflected shock at w = uR + up, with w = up r5/(r5 - 1)
+        r5, T5, P5 = _jump(thermo, T2, P2, lambda r: up * r / (r - 1.0), r5)
+        uR = up / (r5 - 1.0)
+
+        for k, v in zip(ShockConditions._fields, (T2, P2, T5, P5, up, uR)):
+            out[k][sel] = v
+
+    return ShockConditions(*(out[k].reshape(shape) for k in ShockConditions._fields))
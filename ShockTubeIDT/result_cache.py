@@ -0,0 +1,177 @@
+"""
+Copyright 2021 Mark E. Fuller
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from .mechanism_cache import mechanism_key, resolve_mechanism
+
+# bump when a change to the integration would alter cached results
+CACHE_VERSION = 1
+
+# content hashes of mechanism files, keyed by mechanism_key
+_mechanism_hashes = {}
+
+
+def mechanism_hash(mech, name=None):
+    """
+    SHA-256 of the contents of a mechanism file (memoized on path and mtime).
+    """
+    key = mechanism_key(mech, name)
+    digest = _mechanism_hashes.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        try:
+            with open(key[0], "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+        except OSError:
+            # not a file (e.g. YAML string); hash the description itself
+            h.update(str(mech).encode())
+        h.update(str(name).encode())
+        digest = h.hexdigest()
+        _mechanism_hashes[key] = digest
+    return digest
+
+
+def solution_hash(gas):
+    """
+    Hash of the mechanism of a Solution: that of its input file, or of its
+    phase, species and reaction definitions if it was not loaded from one
+    (e.g. a Solution built from Species and Reaction objects).
+    """
+    if os.path.isfile(resolve_mechanism(gas.source)):
+        return mechanism_hash(gas.source, gas.name)
+    record = {
+        "phase": gas.input_data,
+        "species": [s.input_data for s in gas.species()],
+        "reactions": [r.input_data for r in gas.reactions()],
+    }
+    text = json.dumps(record, sort_keys=True, default=repr)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def state_key(gas, settings):
+    """
+    Content-addressed key for the current state of gas and the IDT settings.
+
+    Combines the mechanism file hash, phase name, T, P, the normalized mole
+    fractions, any non-unit rate multipliers and the settings dict.
+    """
+    multipliers = [(i, m) for i, m in enumerate(map(gas.multiplier, range(gas.n_reactions)))
+                   if m != 1.0]
+    X = {k: float(f"{v:.12g}") for k, v in sorted(gas.mole_fraction_dict().items())}
+    record = {
+        "version": CACHE_VERSION,
+        "mechanism": solution_hash(gas),
+        "phase": gas.name,
+        "T": float(f"{gas.T:.12g}"),
+        "P": float(f"{gas.P:.12g}"),
+        "X": X,
+        "multipliers": multipliers,
+        "settings": settings,
+    }
+    text = json.dumps(record, sort_keys=True, default=repr)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Persistent store of ignition delay results in a local SQLite file.
+    Values are stored as JSON (NaN round-trips for non-igniting points).
+
+    Safe to share between the processes of a pool: each process opens its own
+    connection, the database runs in WAL mode and writers wait for the lock.
+    When more than max_entries results are stored, the least recently used
+    ones are deleted.
+    """
+
+    def __init__(self, path="idt_cache.sqlite", max_entries=1000000, timeout=60.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._conn = None
+        self._puts = 0
+
+    def __getstate__(self):
+        # connections do not survive pickling to worker processes
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        return state
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=self.timeout)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, value TEXT, last_used REAL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key):
+        """
+        Stored result for key, or None if absent.
+        """
+        row = self.conn.execute(
+            "SELECT value FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        with self.conn:
+            self.conn.execute(
+                "UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time()),
+            )
+        self._puts += 1
+        if self._puts % 100 == 0:
+            self.evict()
+
+    def evict(self):
+        """
+        Delete least recently used entries beyond max_entries.
+        """
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM results WHERE key IN (SELECT key FROM results "
+                "ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM results")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
@@ -0,0 +1,168 @@
+"""
+Copyright 2021 Mark E. Fuller
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+import os
+
+import numpy as np
+
+
+class IDTResult:
+    """
+    Labeled N-D array of ignition delay times.
+
+    dims names the axes (any of "P", "X", "M", "T"), coords holds one label
+    array per dim and solve_time the wall time per point. Plain indexing,
+    IDTs[q, w, :], returns the bare values as before; sel() and isel()
+    select by label or position and return views where NumPy allows.
+    Structured results (several IDT definitions) give one field with IDTs["OH"].
+    """
+
+    def __init__(self, values, dims, coords, solve_time=None, attrs=None):
+        self.values = values
+        self.dims = tuple(dims)
+        self.coords = {d: np.asarray(coords[d]) for d in self.dims}
+        if solve_time is None:
+            solve_time = np.full(values.shape, np.nan)
+        self.solve_time = solve_time
+        self.attrs = dict(attrs or {})
+        if values.ndim != len(self.dims):
+            raise ValueError(f"{values.ndim}-D values for dims {self.dims}")
+        for d, n in zip(self.dims, values.shape):
+            if len(self.coords[d]) != n:
+                raise ValueError(f"{len(self.coords[d])} labels for axis {d} of length {n}")
+
+    def __repr__(self):
+        shape = ", ".join(f"{d}: {n}" for d, n in zip(self.dims, self.values.shape))
+        return f"<IDTResult ({shape}) {self.values.dtype}>"
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.values, dtype=dtype)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return IDTResult(self.values[key], self.dims, self.coords,
+                             self.solve_time, self.attrs)
+        return self.values[key]
+
+    @property
+    def fields(self):
+        """
+        IDT definition names of a structured result, else None.
+        """
+        return self.values.dtype.names
+
+    @property
+    def ignited(self):
+        """
+        Boolean array, False where a point did not ignite (NaN).
+        For structured results, the first definition is used.
+        """
+        values = self.values if self.fields is None else self.values[self.fields[0]]
+        return ~np.isnan(values)
+
+    def isel(self, **indices):
+        """
+        Select by position, e.g. isel(T=slice(0, 5), X=0). Integer indices
+        drop the axis; ints and slices return views.
+        """
+        values = self.values
+        solve_time = self.solve_time
+        dims = []
+        coords = {}
+        axis = 0
+        for d in self.dims:
+            i = indices.pop(d, slice(None))
+            # index one axis at a time so lists select outer products
+            key = (slice(None),) * axis + (i,)
+            values = values[key]
+            solve_time = solve_time[key]
+            if not np.isscalar(i):
+                dims.append(d)
+                coords[d] = self.coords[d][i]
+                axis += 1
+        if indices:
+            raise KeyError(f"unknown dims {list(indices)}; have {self.dims}")
+        return IDTResult(values, dims, coords, solve_time, self.attrs)
+
+    def index(self, dim, label):
+        """
+        Position of label along dim; numeric labels match to a relative 1e-9.
+        """
+        labels = self.coords[dim]
+        if labels.dtype.kind in "fiu":
+            hits = np.flatnonzero(np.isclose(labels, float(label), rtol=1e-9, atol=0.0))
+        else:
+            hits = np.flatnonzero(labels == str(label))
+        if len(hits) == 0:
+            raise KeyError(f"{label!r} not found along {dim}")
+        return int(hits[0])
+
+    def sel(self, **labels):
+        """
+        Select by label, e.g. sel(P=101325.0, M="gri30.yaml"). A list of
+        labels keeps the axis (copy); a single label drops it (view).
+        """
+        indices = {}
+        for d, label in labels.items():
+            if isinstance(label, (list, tuple, np.ndarray)):
+                indices[d] = [self.index(d, v) for v in label]
+            else:
+                indices[d] = self.index(d, label)
+        return self.isel(**indices)
+
+    def save(self, path):
+        """
+        Write to directory path as .npy arrays plus a JSON description.
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "values.npy"), self.values)
+        np.save(os.path.join(path, "solve_time.npy"), self.solve_time)
+        meta = {
+            "dims": self.dims,
+            "coords": {d: self.coords[d].tolist() for d in self.dims},
+            "attrs": self.attrs,
+        }
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=1)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Read a result written by save(). With mmap=True the arrays are
+        memory-mapped, so only the parts that are selected are read from disk.
+        """
+        mode = "r" if mmap else None
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        values = np.load(os.path.join(path, "values.npy"), mmap_mode=mode)
+        solve_time = np.load(os.path.join(path, "solve_time.npy"), mmap_mode=mode)
+        return cls(values, meta["dims"], meta["coords"], solve_time, meta["attrs"])
+
+
+def sweep_result(values, solve_time, dims, coords):
+    """
+    Wrap a sweep result; mixtures and mechanisms are labeled by their string form.
+    """
+    coords = {
+        d: [str(v) for v in coords[d]] if d in ("X", "M") else np.asarray(coords[d], float)
+        for d in dims
+    }
+    return IDTResult(values, dims, coords, solve_time)
@@ -0,0 +1,139 @@
+"""
+Copyright 2021 Mark E. Fuller
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import json
+import os
+
+import cantera as ct
+import numpy as np
+
+from .mechanism_cache import get_solution
+from .result_cache import mechanism_hash
+
+
+def _mechanism(mech):
+    """
+    (identifier, number of reactions) of a Solution or mechanism file name.
+    """
+    if isinstance(mech, ct.Solution):
+        source = getattr(mech, "source", None)
+        if source and os.path.splitext(source)[1]:
+            return mechanism_hash(source, mech.name), mech.n_reactions
+        return f"{mech.name}:{mech.n_species}:{mech.n_reactions}", mech.n_reactions
+    if isinstance(mech, tuple):
+        return mechanism_hash(*mech), get_solution(*mech).n_reactions
+    return mechanism_hash(mech), get_solution(mech).n_reactions
+
+
+class CostModel:
+    """
+    Predicted wall time of IDT points from their temperature and mechanism.
+
+    Timings are fitted per mechanism as ln(seconds) = a + b * 1000/T. A
+    mechanism with fewer than `minSamples` timings borrows the fit of all
+    timings with ln(seconds) scaled by its number of reactions; without
+    any timings, cost grows with mechanism size and 1000/T.
+
+    With a path, timings are read from and saved to a JSON file so that
+    later runs start from what earlier runs measured. At most `keep` of
+    the latest timings are kept per mechanism.
+    """
+
+    def __init__(self, path=None, minSamples=4, keep=500):
+        self.path = path
+        self.minSamples = minSamples
+        self.keep = keep
+        self.timings = {}
+        self._ids = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                self.timings = json.load(f)
+
+    def _id(self, mech):
+        key = mech if isinstance(mech, (str, tuple)) else id(mech)
+        if key not in self._ids:
+            self._ids[key] = _mechanism(mech)
+        return self._ids[key]
+
+    def _fit(self, invT, logsec):
+        if len(invT) < 2 or np.ptp(invT) == 0.0:
+            return None
+        b, a = np.polyfit(invT, logsec, 1)
+        return a, b
+
+    def predict(self, mech, T):
+        """
+        Predicted seconds for temperatures T of one mechanism.
+        """
+        invT = 1000.0 / np.asarray(T, dtype=float)
+        ident, size = self._id(mech)
+        samples = self.timings.get(ident, {}).get("samples", [])
+        if len(samples) >= self.minSamples:
+            coeffs = self._fit(*np.array(samples).T)
+            if coeffs is not None:
+                return np.exp(coeffs[0] + coeffs[1] * invT)
+
+        # all timings, normalized by mechanism size
+        invTs, logsecs = [], []
+        for entry in self.timings.values():
+            for x, y in entry["samples"]:
+                invTs.append(x)
+                logsecs.append(y - np.log(entry["size"]))
+        coeffs = self._fit(np.array(invTs), np.array(logsecs))
+        if coeffs is None:
+            coeffs = (np.log(1e-5), 3.0)
+        return size * np.exp(coeffs[0] + coeffs[1] * invT)
+
+    def update(self, mech, T, seconds):
+        """
+        Record measured seconds of points at temperatures T.
+        """
+        ident, size = self._id(mech)
+        entry = self.timings.setdefault(ident, {"size": size, "samples": []})
+        for Tn, sec in zip(np.atleast_1d(T), np.atleast_1d(seconds)):
+            if np.isfinite(sec) and sec > 0.0:
+                entry["samples"].append([1000.0 / float(Tn), float(np.log(sec))])
+        del entry["samples"][: -self.keep]
+
+    def save(self):
+        """
+        Write the timings to path, replacing the file atomically.
+        """
+        if self.path is None:
+            return
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.timings, f)
+        os.replace(tmp, self.path)
+
+
+def longest_first(model, curves, Tgrid, todo):
+    """
+    (curve, point) pairs of the points still to do, ordered by decreasing
+    predicted cost.
+    """
+    pairs = []
+    costs = []
+    for c, (mech, P, X) in enumerate(curves):
+        idx = todo[c]
+        if len(idx) == 0:
+            continue
+        costs.append(model.predict(mech, Tgrid[c, idx]))
+        pairs.extend((c, int(q)) for q in idx)
+    if not pairs:
+        return []
+    order = np.argsort(-np.concatenate(costs), kind="stable")
+    return [pairs[n] for n in order]
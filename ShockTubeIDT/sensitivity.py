@@ -0,0 +1,205 @@
+"""
+Copyright 2021 Mark E. Fuller
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .engine import IDTEngine, engine_for, pressure_ratio
+from .ignition_delay import ignition_delay
+from .mechanism_cache import get_solution
+from .parallel import _multipliers, mechanism_spec
+
+
+def _perturbed_taus(gas, reactions, factor, kwargs):
+    """
+    IDT with each reaction's rate multiplied by (1 + factor) in turn, reusing
+    one reactor network. The gas state and multipliers are restored after.
+    """
+    state = gas.state
+    engine = engine_for(gas, kwargs.get("mode", "UV"))
+    taus = np.empty(len(reactions))
+    for n, i in enumerate(reactions):
+        m = gas.multiplier(i)
+        gas.set_multiplier(m * (1.0 + factor), i)
+        gas.state = state
+        try:
+            taus[n] = ignition_delay(gas, engine=engine, **kwargs)
+        finally:
+            gas.set_multiplier(m, i)
+    gas.state = state
+    return taus
+
+
+def _run_perturbations(spec, state, multipliers, reactions, factor, kwargs):
+    """
+    Worker task: unperturbed and perturbed IDTs for a chunk of reactions at
+    one state, (tau0, taus), so that both come from the same process.
+    """
+    gas = get_solution(*spec)
+    gas.set_multiplier(1.0)
+    for i, m in multipliers.items():
+        gas.set_multiplier(m, i)
+    # the full state array, as resetting T, P and X is not exact to the last bit
+    gas.state = state
+    try:
+        tau0 = ignition_delay(gas, engine=engine_for(gas, kwargs.get("mode", "UV")), **kwargs)
+        gas.state = state
+        return tau0, _perturbed_taus(gas, reactions, factor, kwargs)
+    finally:
+        gas.set_multiplier(1.0)
+
+
+def screen_reactions(gas, tau, top, mode="UV", pressureRise=None, pressureProfile=None,
+                     endTime=1.0, **kwargs):
+    """
+    Rank reactions with Cantera's reactor sensitivities and return the
+    indices of the `top` most important ones.
+
+    The importance of reaction i is the largest |dT/d ln k_i| seen while
+    integrating up to the ignition delay tau, in the reactor of the given
+    mode (see engine.IDTEngine). Other ignition_delay keyword arguments
+    are ignored.
+    """
+    state = gas.state
+    # a new engine, as sensitivity parameters must be added before integrating
+    engine = IDTEngine(gas, mode)
+    r = engine.reactor
+    for i in range(gas.n_reactions):
+        r.add_sensitivity_reaction(i)
+    pressureRatio = None
+    if mode == "compression":
+        pressureRatio = pressure_ratio(pressureRise, pressureProfile)
+    r, net = engine.start(pressureRatio, endTime)
+    row = r.component_index("temperature")
+
+    importance = np.zeros(gas.n_reactions)
+    t = 0.0
+    while t < tau:
+        t = net.step()
+        np.maximum(importance, np.abs(net.sensitivities()[row]), out=importance)
+    gas.state = state
+
+    ranked = np.argsort(importance)[::-1]
+    return np.sort(ranked[:top])
+
+
+def idt_sensitivity(gas, reactions=None, factor=0.1, top=None, max_workers=1,
+                    pool=None, **kwargs):
+    """
+    Brute-force sensitivity of the IDT to each reaction rate at the current
+    state of gas: S_i = d ln(tau) / d ln(k_i), from a forward perturbation of
+    each rate multiplier by `factor`.
+
+    reactions restricts the reactions considered (default: all). With
+    top=k, Cantera's reactor sensitivities are used first to screen for the
+    k most important reactions and only those are brute-forced.
+    Perturbations run in a process pool with max_workers other than 1, or in
+    an existing concurrent.futures pool (pass its size as max_workers).
+    Keyword arguments are passed to ignition_delay; the IDT definition is
+    chosen with signal (e.g. signal="OH>1e-4"), as S is computed for one.
+
+    Returns a DataFrame sorted by |S| with columns reaction, equation,
+    sensitivity and tau (the perturbed IDT).
+    """
+
+    if kwargs.get("definitions") is not None:
+        raise ValueError("idt_sensitivity computes S for one IDT definition; "
+                         "select it with signal instead of definitions")
+    state = gas.state
+    engine = engine_for(gas, kwargs.get("mode", "UV"))
+    tau0 = ignition_delay(gas, engine=engine, **kwargs)
+    gas.state = state
+
+    if reactions is None:
+        reactions = np.arange(gas.n_reactions)
+    reactions = np.asarray(reactions, dtype=int)
+    if top is not None and np.isfinite(tau0):
+        screened = screen_reactions(gas, tau0, top, **kwargs)
+        reactions = np.intersect1d(reactions, screened)
+
+    if max_workers == 1 and pool is None:
+        taus = _perturbed_taus(gas, reactions, factor, kwargs)
+        ratios = taus / tau0
+    else:
+        spec = mechanism_spec(gas)
+        multipliers = _multipliers(gas)
+        max_workers = max_workers or os.cpu_count() or 1
+        own = pool is None
+        if own:
+            pool = ProcessPoolExecutor(max_workers=max_workers)
+        # a few chunks per worker evens out the load
+        chunks = [c for c in np.array_split(reactions, 4 * max_workers) if len(c)]
+        try:
+            futures = [
+                pool.submit(_run_perturbations, spec, state, multipliers, chunk,
+                            factor, kwargs)
+                for chunk in chunks
+            ]
+            results = [f.result() for f in futures]
+            taus = np.concatenate([t for _, t in results] + [np.empty(0)])
+            # each chunk is relative to the unperturbed IDT of its own worker
+            ratios = np.concatenate([t / t0 for t0, t in results] + [np.empty(0)])
+        finally:
+            if own:
+                pool.shutdown()
+
+    S = np.log(ratios) / math.log1p(factor)
+    table = pd.DataFrame({
+        "reaction": reactions,
+        "equation": [gas.reaction(i).equation for i in reactions],
+        "sensitivity": S,
+        "tau": taus,
+    })
+    order = np.argsort(-np.abs(np.nan_to_num(S, nan=0.0)), kind="stable")
+    table = table.iloc[order].reset_index(drop=True)
+    table.attrs["tau0"] = tau0
+    return table
+
+
+def sensitivity_sweep(gas, Trange, Prange, Xlist, factor=0.1, top=None,
+                      max_workers=1, **kwargs):
+    """
+    idt_sensitivity at every (T, P, X) point of a sweep, sharing one process
+    pool. Returns a long DataFrame with columns T, P, X, rank, reaction,
+    equation, sensitivity and tau, ranked within each point.
+    """
+
+    pool = None
+    if max_workers != 1:
+        pool = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count() or 1)
+
+    tables = []
+    try:
+        for X in Xlist:
+            for P in Prange:
+                for T in Trange:
+                    gas.TPX = T, P, X
+                    table = idt_sensitivity(gas, factor=factor, top=top,
+                                            max_workers=max_workers, pool=pool, **kwargs)
+                    table.insert(0, "rank", np.arange(1, len(table) + 1))
+                    table.insert(0, "X", str(X))
+                    table.insert(0, "P", P)
+                    table.insert(0, "T", T)
+                    tables.append(table)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return pd.concat(tables, ignore_index=True)
@@ -0,0 +1,170 @@
+"""
+Copyright 2021 Mark E. Fuller
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import itertools
+
+import numpy as np
+
+from .engine import engine_for
+from .ignition_delay import ignition_delay
+
+
+def _locate(grid, x):
+    """
+    Interval index and linear weight of x on an ascending grid.
+    """
+    i = np.clip(np.searchsorted(grid, x, side="right") - 1, 0, len(grid) - 2)
+    w = (x - grid[i]) / (grid[i + 1] - grid[i])
+    return i, w
+
+
+class IDTSurrogate:
+    """
+    Fast evaluator of ignition delay times interpolated from a sweep.
+
+    Built from idt_sweep_TPX output (indexed X, P, T) with the temperatures,
+    pressures and mixtures of the sweep. ln(tau) is interpolated linearly in
+    1000/T, ln(P) and a scalar composition parameter per mixture (params,
+    e.g. the equivalence ratio; default: the mixture number), i.e.
+    piecewise Arrhenius between sweep temperatures.
+
+    Queries inside the sweep box whose neighbouring grid points all ignited
+    are trusted. Other queries are integrated with ignition_delay when gas is
+    given; mixture(param) must then return the composition for a parameter
+    that is not one of params. Keyword arguments are passed to ignition_delay.
+
+    cv_error holds the leave-one-out error in ln(tau) (rms, max, n): every
+    interior grid point is predicted from its neighbours along each axis.
+    """
+
+    def __init__(self, IgnDelays, Trange, Prange, Xlist, params=None, gas=None,
+                 mixture=None, **kwargs):
+        table = np.log(np.asarray(IgnDelays, dtype=float))
+        if params is None:
+            params = np.arange(len(Xlist), dtype=float)
+        axes = [np.asarray(params, float), np.log(np.asarray(Prange, float)),
+                1000.0 / np.asarray(Trange, float)]
+        if table.shape != tuple(len(a) for a in axes):
+            raise ValueError(f"IDTs of shape {table.shape} for a "
+                             f"{tuple(len(a) for a in axes)} sweep")
+
+        # ascending axes for interpolation
+        for d, a in enumerate(axes):
+            order = np.argsort(a)
+            axes[d] = a[order]
+            table = np.take(table, order, axis=d)
+        self.axes = axes
+        self.table = table
+        self.Xlist = [Xlist[i] for i in np.argsort(np.asarray(params, float))]
+        self.gas = gas
+        self.mixture = mixture
+        self.kwargs = kwargs
+        self.cv_error = self._cross_validate()
+
+    def _cross_validate(self):
+        errors = []
+        for d, a in enumerate(self.axes):
+            if len(a) < 3:
+                continue
+            lo = np.take(self.table, np.arange(len(a) - 2), axis=d)
+            mid = np.take(self.table, np.arange(1, len(a) - 1), axis=d)
+            hi = np.take(self.table, np.arange(2, len(a)), axis=d)
+            w = (a[1:-1] - a[:-2]) / (a[2:] - a[:-2])
+            w = w.reshape([-1 if k == d else 1 for k in range(self.table.ndim)])
+            err = (1.0 - w) * lo + w * hi - mid
+            errors.append(err[np.isfinite(err)])
+        errors = np.concatenate(errors + [np.empty(0)])
+        if len(errors) == 0:
+            return {"rms": np.nan, "max": np.nan, "n": 0}
+        return {"rms": float(np.sqrt(np.mean(errors**2))),
+                "max": float(np.max(np.abs(errors))), "n": len(errors)}
+
+    def log_tau(self, T, P, param=None):
+        """
+        Interpolated ln(tau) and a boolean array marking trusted queries.
+        Arguments are broadcast against each other.
+        """
+        if param is None:
+            param = self.axes[0][0]
+        x = np.broadcast_arrays(np.asarray(param, float), np.log(np.asarray(P, float)),
+                                1000.0 / np.asarray(T, float))
+        trusted = np.ones(x[0].shape, dtype=bool)
+        index = []
+        weight = []
+        for a, xi in zip(self.axes, x):
+            if len(a) == 1:
+                # single-valued axis: only exact matches are covered
+                trusted &= np.isclose(xi, a[0], rtol=1e-9, atol=1e-12)
+                index.append(np.zeros(xi.shape, dtype=int))
+                weight.append(None)
+                continue
+            trusted &= (xi >= a[0]) & (xi <= a[-1])
+            i, w = _locate(a, xi)
+            index.append(i)
+            weight.append(w)
+
+        out = np.zeros(trusted.shape)
+        for corner in itertools.product((0, 1), repeat=len(self.axes)):
+            idx = []
+            wc = np.ones(trusted.shape)
+            for i, w, c in zip(index, weight, corner):
+                if w is None:
+                    if c:
+                        break
+                    idx.append(i)
+                    continue
+                idx.append(i + c)
+                wc = wc * (w if c else 1.0 - w)
+            else:
+                out += wc * self.table[tuple(idx)]
+        trusted &= np.isfinite(out)
+        return out, trusted
+
+    def __call__(self, T, P, param=None, fallback=True):
+        """
+        Ignition delay times at (T, P, param). Untrusted queries are
+        integrated if fallback is set and gas was given, else NaN.
+        """
+        logtau, trusted = self.log_tau(T, P, param)
+        tau = np.array(np.exp(logtau))
+        tau[~trusted] = np.nan
+        if fallback and self.gas is not None and not trusted.all():
+            if param is None:
+                param = self.axes[0][0]
+            T, P, param = np.broadcast_arrays(T, P, param)
+            tau[~trusted] = self.integrate(T[~trusted], P[~trusted], param[~trusted])
+        return tau[()]
+
+    def integrate(self, T, P, param):
+        """
+        IDTs of the given points by direct integration.
+        """
+        gas = self.gas
+        state = gas.state
+        engine = engine_for(gas, self.kwargs.get("mode", "UV"))
+        out = np.full(len(T), np.nan)
+        for n, (Tn, Pn, pn) in enumerate(zip(T, P, param)):
+            hits = np.flatnonzero(np.isclose(self.axes[0], pn, rtol=1e-9, atol=1e-12))
+            if len(hits):
+                X = self.Xlist[hits[0]]
+            elif self.mixture is not None:
+                X = self.mixture(pn)
+            else:
+                continue
+            gas.TPX = Tn, Pn, X
+            out[n] = ignition_delay(gas, engine=engine, **self.kwargs)
+        gas.state = state
+        return out
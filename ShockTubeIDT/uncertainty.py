@@ -0,0 +1,172 @@
+"""
+Copyright 2021 Mark E. Fuller
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import warnings
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .engine import engine_for
+from .ignition_delay import ignition_delay
+from .mechanism_cache import get_solution
+from .parallel import _multipliers, mechanism_spec
+
+UQBands = namedtuple(
+    "UQBands", ["T", "quantiles", "bands", "logmean", "logstd", "ignited", "samples"]
+)
+UQBands.__doc__ = """
+Monte Carlo IDT statistics along a temperature curve.
+
+bands[k] is the curve of quantiles[k]; logmean and logstd are the mean and
+standard deviation of ln(tau); ignited is the fraction of samples that
+ignited at each T; samples holds every sampled tau (nSamples x nT).
+"""
+
+
+def uncertainty_sigmas(gas, factors):
+    """
+    Standard deviation of ln(k) per reaction from uncertainty factors.
+
+    factors may be a scalar applied to every reaction, an array with one
+    factor per reaction, or a dict {reaction index: factor}. A factor f is
+    taken as the 2-sigma bound, i.e. k0/f <= k <= k0*f at ~95%.
+    """
+    f = np.ones(gas.n_reactions)
+    if isinstance(factors, dict):
+        for i, v in factors.items():
+            f[i] = v
+    elif factors is not None:
+        f[:] = factors
+    return np.log(f) / 2.0
+
+
+def _sample(seed, n, sigmas, Tsigma, Psigma):
+    """
+    Perturbations of sample n: rate multipliers, T offset and P scale.
+    Seeded per sample so results do not depend on how samples are scheduled.
+    """
+    rng = np.random.default_rng([seed, n])
+    multipliers = np.exp(sigmas * rng.standard_normal(len(sigmas)))
+    dT = Tsigma * rng.standard_normal()
+    Pscale = 1.0 + Psigma * rng.standard_normal()
+    return multipliers, dT, Pscale
+
+
+def _run_samples(gas, samples, Trange, P, X, seed, sigmas, Tsigma, Psigma, kwargs):
+    """
+    IDT curves of the given sample numbers. Sampled multipliers scale the
+    current ones, which are restored afterwards.
+    """
+    engine = engine_for(gas, kwargs.get("mode", "UV"))
+    active = np.flatnonzero(sigmas)
+    base = np.array([gas.multiplier(i) for i in active])
+    out = np.empty((len(samples), len(Trange)))
+    try:
+        for s, n in enumerate(samples):
+            multipliers, dT, Pscale = _sample(seed, n, sigmas, Tsigma, Psigma)
+            for i, m in zip(active, base * multipliers[active]):
+                gas.set_multiplier(m, i)
+            for q, T in enumerate(Trange):
+                gas.TPX = T + dT, P * Pscale, X
+                out[s, q] = ignition_delay(gas, engine=engine, **kwargs)
+    finally:
+        for i, m in zip(active, base):
+            gas.set_multiplier(m, i)
+    return samples, out
+
+
+def _run_samples_worker(spec, multipliers, *args):
+    """
+    Worker task: _run_samples on the cached Solution, starting from the
+    caller's rate multipliers.
+    """
+    gas = get_solution(*spec)
+    gas.set_multiplier(1.0)
+    for i, m in multipliers.items():
+        gas.set_multiplier(m, i)
+    try:
+        return _run_samples(gas, *args)
+    finally:
+        gas.set_multiplier(1.0)
+
+
+def idt_uncertainty(gas, Trange, P, X, nSamples=1000, factors=2.0, Tsigma=0.0,
+                    Psigma=0.0, seed=0, quantiles=(0.025, 0.5, 0.975), max_workers=1,
+                    **kwargs):
+    """
+    Monte Carlo uncertainty of an IDT curve (cf. idt_sweep_T).
+
+    Each sample draws log-normal rate multipliers from the uncertainty
+    factors (see uncertainty_sigmas) and normally distributed offsets of the
+    post-shock state: Tsigma in K and Psigma relative to P. Samples are run
+    in a process pool with max_workers other than 1 and stored in a
+    preallocated array; only tau is kept per sample, not its time history.
+    Keyword arguments are passed to ignition_delay; the bands are for one
+    IDT definition, chosen with signal (e.g. signal="OH").
+
+    Returns UQBands; quantiles and log-statistics ignore non-igniting samples.
+    """
+
+    if kwargs.get("definitions") is not None:
+        raise ValueError("idt_uncertainty computes bands for one IDT definition; "
+                         "select it with signal instead of definitions")
+    Trange = np.asarray(Trange, dtype=float)
+    sigmas = uncertainty_sigmas(gas, factors)
+    taus = np.empty((nSamples, len(Trange)))
+    args = (Trange, P, X, seed, sigmas, Tsigma, Psigma, kwargs)
+
+    if max_workers == 1:
+        state = gas.state
+        _, taus[:] = _run_samples(gas, np.arange(nSamples), *args)
+        gas.state = state
+    else:
+        max_workers = max_workers or os.cpu_count() or 1
+        spec = mechanism_spec(gas)
+        multipliers = _multipliers(gas)
+        chunks = [c for c in np.array_split(np.arange(nSamples), 4 * max_workers) if len(c)]
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(_run_samples_worker, spec, multipliers, c, *args) for c in chunks]
+            for future in as_completed(futures):
+                samples, out = future.result()
+                taus[samples] = out
+
+    logtau = np.log(taus)
+    with warnings.catch_warnings():
+        # temperatures at which no sample ignited give NaN statistics
+        warnings.simplefilter("ignore", RuntimeWarning)
+        bands = np.nanquantile(taus, quantiles, axis=0)
+        logmean = np.nanmean(logtau, axis=0)
+        logstd = np.nanstd(logtau, axis=0)
+    ignited = np.mean(np.isfinite(taus), axis=0)
+
+    return UQBands(Trange, np.asarray(quantiles), bands, logmean, logstd, ignited, taus)
+
+
+def stack_bands(results, lower=0, upper=-1):
+    """
+    (lower, upper) band arrays indexed (X, M, T) for idt_plots.comp_mech_data,
+    from one UQBands, a list of them per mechanism, or nested lists
+    [mixture][mechanism]. lower and upper index the quantiles.
+    """
+    if isinstance(results, UQBands):
+        results = [results]
+    if isinstance(results[0], UQBands):
+        results = [results]
+    lo = np.array([[r.bands[lower] for r in row] for row in results])
+    hi = np.array([[r.bands[upper] for r in row] for row in results])
+    return lo, hi
@@ -9,11 +9,17 @@ setup(
     author_email='fuller@stossrohr.net',
     license='Apache-2.0',
     packages=['ShockTubeIDT'],
+    entry_points={
+        'console_scripts': ['shocktubeidt=ShockTubeIDT.campaign:main'],
+    },
     install_requires=['cantera>=2.4.0',
                       'matplotlib',
                       'numpy',
                       'pandas',
                       ],
+    extras_require={
+        'campaign': ['PyYAML', 'tomli; python_version < "3.11"'],
+    },
 
     classifiers=[
         'Development Status :: 1 - Planning',
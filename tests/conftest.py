@@ -0,0 +1,13 @@
+import pytest
+
+from ShockTubeIDT.mechanism_cache import get_solution
+
+H2 = "H2:0.04,O2:0.02,AR:0.94"
+
+
+@pytest.fixture
+def gas():
+    gas = get_solution("h2o2.yaml")
+    gas.set_multiplier(1.0)
+    gas.TPX = 1000.0, 101325.0, H2
+    return gas
@@ -0,0 +1,44 @@
+import json
+
+import numpy as np
+
+from ShockTubeIDT.checkpoint import Checkpoint
+from ShockTubeIDT.ignition_delay import idt_sweep_T, idt_sweep_T_adaptive
+
+from conftest import H2
+
+COARSE = [900.0, 1000.0, 1100.0, 1200.0]
+
+
+def test_points_are_added_where_the_curve_bends(gas):
+    T, taus = idt_sweep_T_adaptive(gas, COARSE, 101325.0, H2, tolerance=0.2, maxPoints=12)
+    assert len(T) == 12
+    assert np.all(np.diff(T) > 0.0)
+    assert set(COARSE) <= set(T)
+    # the steep crossover below 1000 K gets more points than the Arrhenius part
+    assert np.sum(T < 1000.0) > np.sum(T > 1100.0)
+    assert np.allclose(taus[np.isin(T, COARSE)], idt_sweep_T(gas, COARSE, 101325.0, H2))
+
+
+def test_refinement_stops(gas):
+    T, _ = idt_sweep_T_adaptive(gas, COARSE, 101325.0, H2, tolerance=0.2, maxPoints=5)
+    assert len(T) == 5
+    T, _ = idt_sweep_T_adaptive(gas, COARSE, 101325.0, H2, tolerance=0.2, minStep=100.0)
+    assert len(T) == 4
+
+
+def test_interrupted_refinement_resumes(tmp_path, gas):
+    path = tmp_path / "refine.jsonl"
+    first = idt_sweep_T_adaptive(gas, COARSE, 101325.0, H2, tolerance=0.2, maxPoints=8,
+                                 checkpoint=path)
+    assert len(Checkpoint(path).done) == 8
+    # logged values are reused as they are, not recomputed
+    lines = [json.loads(line) for line in open(path)]
+    with open(path, "w") as f:
+        for rec in lines:
+            f.write(json.dumps({**rec, "v": 2.0 * rec["v"]}) + "\n")
+    again = idt_sweep_T_adaptive(gas, COARSE, 101325.0, H2, tolerance=0.2, maxPoints=8,
+                                 checkpoint=path)
+    assert np.array_equal(first[0], again[0])
+    assert np.allclose(again[1], 2.0 * first[1])
+    assert len(Checkpoint(path).done) == 8
@@ -0,0 +1,29 @@
+import math
+
+from ShockTubeIDT.benchmark import SCENARIOS, _measure, compare
+
+
+def _record(seconds=1.0, max_rss=100 * 2**20, tau=(1e-3, 2e-3)):
+    return {"seconds": seconds, "max_rss": max_rss, "tau": list(tau)}
+
+
+def test_compare_accepts_unchanged():
+    assert compare({"a": _record()}, {"a": _record()}) == []
+    # scenarios missing from the baseline are not compared
+    assert compare({"b": _record(seconds=10.0)}, {"a": _record()}) == []
+
+
+def test_compare_flags_regressions():
+    baseline = {"a": _record()}
+    assert "slower" in compare({"a": _record(seconds=1.5)}, baseline)[0]
+    assert "memory" in compare({"a": _record(max_rss=200 * 2**20)}, baseline)[0]
+    assert "drift" in compare({"a": _record(tau=(1.01e-3, 2e-3))}, baseline)[0]
+    assert "ignited" in compare({"a": _record(tau=(math.nan, 2e-3))}, baseline)[0]
+    assert compare({"a": _record(seconds=1.5)}, baseline, slowdown=1.0) == []
+
+
+def test_measure_point():
+    record = _measure("ignition_delay/h2o2", repeat=1)
+    assert set(record) >= {"seconds", "max_rss", "tau", "steps", "rhs_evals"}
+    assert record["steps"] > 0 and record["max_rss"] > 0
+    assert "ignition_delay/h2o2" in SCENARIOS
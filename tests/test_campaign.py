@@ -0,0 +1,70 @@
+import copy
+import os
+
+import numpy as np
+import pytest
+
+from ShockTubeIDT.campaign import expand_campaign, grid, load_campaign, main, run_campaign
+
+from conftest import H2
+
+CAMPAIGN = {
+    "settings": {"endTime": 0.1},
+    "sweep": [
+        {"name": "a", "mechanisms": "h2o2.yaml", "mixtures": H2, "P": 101325.0,
+         "T": [1000.0, 1100.0]},
+        {"name": "b", "mechanisms": ["h2o2.yaml"], "mixtures": ["O2:0.02,H2:0.04,AR:0.94"],
+         "P": [101325.0], "T": {"start": 1100.0, "stop": 1300.0, "step": 100.0}},
+    ],
+}
+
+
+def _logged(output):
+    with open(os.path.join(output, "points.jsonl")) as f:
+        return sum(1 for _ in f)
+
+
+def test_grid():
+    assert np.array_equal(grid({"start": 900, "stop": 1000, "step": 50}), [900, 950, 1000])
+    assert np.array_equal(grid({"start": 900, "stop": 1000, "num": 3}), [900, 950, 1000])
+    inverse = grid({"start": 900, "stop": 1000, "num": 3, "spacing": "inverse"})
+    assert np.allclose(np.diff(1000.0 / inverse), np.diff(1000.0 / inverse)[0])
+    assert np.array_equal(grid(1e5), [1e5])
+
+
+def test_shared_points_are_listed_once():
+    points, sweeps = expand_campaign(CAMPAIGN)
+    # 1100 K appears in both sweeps, with the mixture written differently
+    assert len(points) == 4
+    assert sweeps[0]["index"].shape == (1, 1, 1, 2)
+    assert sweeps[1]["index"][0, 0, 0, 0] == sweeps[0]["index"][0, 0, 0, 1]
+
+
+def test_edited_campaign_runs_only_new_points(tmp_path):
+    output = str(tmp_path / "out")
+    results = run_campaign(CAMPAIGN, output, max_workers=1)
+    assert set(results) == {"a", "b"}
+    assert results["a"].sel(T=1100.0).values == results["b"].sel(T=1100.0).values
+    assert os.path.exists(os.path.join(output, "points.csv"))
+    assert _logged(output) == 4
+
+    edited = copy.deepcopy(CAMPAIGN)
+    edited["sweep"][0]["T"] = [1000.0, 1100.0, 1200.0, 1400.0]
+    rerun = run_campaign(edited, output, max_workers=1)
+    assert _logged(output) == 5
+    assert rerun["a"].sel(T=1000.0).values == results["a"].sel(T=1000.0).values
+
+    run_campaign(edited, output, max_workers=1, fresh=True)
+    assert _logged(output) == 5
+
+
+def test_campaign_file(tmp_path, capsys):
+    path = tmp_path / "c.toml"
+    path.write_text('[settings]\nendTime = 0.1\n\n[[sweep]]\nmechanisms = "h2o2.yaml"\n'
+                    f'mixtures = "{H2}"\nP = 101325.0\n'
+                    'T = {start = 1000, stop = 1200, num = 3}\n')
+    assert load_campaign(str(path))["sweep"][0]["T"]["num"] == 3
+    assert main([str(path), "--dry-run"]) == 0
+    assert "3 points" in capsys.readouterr().out
+    with pytest.raises(ValueError):
+        load_campaign(str(tmp_path / "c.ini"))
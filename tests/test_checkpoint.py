@@ -0,0 +1,58 @@
+import cantera as ct
+import numpy as np
+import pytest
+
+from ShockTubeIDT.checkpoint import Checkpoint, point_keys
+from ShockTubeIDT.ignition_delay import idt_sweep_T
+
+from conftest import H2
+
+SPECS = [(("h2o2.yaml", None), 101325.0, H2)]
+
+
+def test_point_keys_are_per_point():
+    keys = point_keys(SPECS, [1000.0, 1100.0], {"endTime": 0.1})
+    more = point_keys(SPECS, [1000.0, 1100.0, 1200.0], {"endTime": 0.1})
+    assert keys.shape == (1, 2)
+    assert list(more[0, :2]) == list(keys[0])
+    assert point_keys(SPECS, [1000.0], {"endTime": 0.2})[0, 0] != keys[0, 0]
+    # settings that do not change the result are not part of the key
+    assert point_keys(SPECS, [1000.0], {"endTime": 0.1, "horizon": 1e-3})[0, 0] == keys[0, 0]
+    assert point_keys(SPECS, [1000.0], {"endTime": 0.1}, [{1: 5.0}])[0, 0] != keys[0, 0]
+
+
+def test_point_keys_reject_callables():
+    with pytest.raises(ValueError):
+        point_keys(SPECS, [1000.0], {"pressureProfile": lambda t: 1.0})
+
+
+def test_truncated_line_is_ignored(tmp_path):
+    path = tmp_path / "log.jsonl"
+    with Checkpoint(path) as log:
+        log.write("a", 1.0, 0.5)
+        log.write("b", {"OH": 2.0}, 0.5)
+    with open(path, "a") as f:
+        f.write('{"k": "c", "v": 3')
+
+    with Checkpoint(path) as log:
+        assert log.done == {"a": (1.0, 0.5), "b": ({"OH": 2.0}, 0.5)}
+        log.write("d", 4.0, 0.5)
+    assert set(Checkpoint(path).done) == {"a", "b", "d"}
+
+
+def test_sweep_resumes_from_log(tmp_path):
+    path = tmp_path / "sweep.jsonl"
+    first = idt_sweep_T("h2o2.yaml", [1000.0, 1100.0], 101325.0, H2, checkpoint=path)
+    both = idt_sweep_T("h2o2.yaml", [1000.0, 1100.0, 1200.0], 101325.0, H2, checkpoint=path)
+    assert np.array_equal(both[:2], first)
+    assert len(Checkpoint(path).done) == 3
+
+
+def test_sweep_does_not_reuse_unmultiplied_points(tmp_path):
+    path = tmp_path / "sweep.jsonl"
+    gas = ct.Solution("h2o2.yaml")
+    plain = idt_sweep_T(gas, [1000.0], 101325.0, H2, checkpoint=path)
+    gas.set_multiplier(5.0, 1)
+    changed = idt_sweep_T(gas, [1000.0], 101325.0, H2, checkpoint=path)
+    assert changed[0] != plain[0]
+    assert len(Checkpoint(path).done) == 2
@@ -0,0 +1,39 @@
+import math
+
+import numpy as np
+
+from ShockTubeIDT.detection import RateMaximum, SpeciesPeak, Threshold, parse_definition
+from ShockTubeIDT.ignition_delay import ignition_delay
+from ShockTubeIDT.parallel import run_curves
+
+from conftest import H2
+
+
+def test_parse_definition():
+    assert isinstance(parse_definition("dPdt"), RateMaximum)
+    assert isinstance(parse_definition("OH*"), SpeciesPeak)
+    rise = parse_definition("T+400")
+    assert isinstance(rise, Threshold) and rise.rise == 400.0
+    # the caller's spelling is kept as the name
+    assert parse_definition("OH>1e-4").name == "OH>1e-4"
+
+
+def test_definitions_in_one_integration(gas):
+    state = gas.state
+    taus = ignition_delay(gas, definitions=["dPdt", "OH", "OH>1e-4", "T+400"])
+    assert list(taus) == ["dPdt", "OH", "OH>1e-4", "T+400"]
+    gas.state = state
+    assert taus["dPdt"] == ignition_delay(gas)
+    assert taus["OH>1e-4"] < taus["dPdt"]
+
+
+def test_no_ignition_is_nan(gas):
+    gas.TPX = 600.0, 101325.0, H2
+    assert math.isnan(ignition_delay(gas, endTime=1e-3))
+
+
+def test_structured_sweep_results():
+    values = run_curves(ignition_delay, [("h2o2.yaml", 101325.0, H2)], [1000.0, 1200.0],
+                        definitions=["dPdt", "OH>1e-4"])
+    assert values.dtype.names == ("dPdt", "OH>1e-4")
+    assert np.all(values["OH>1e-4"] < values["dPdt"])
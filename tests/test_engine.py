@@ -0,0 +1,38 @@
+import warnings
+
+import cantera as ct
+
+from ShockTubeIDT.engine import IDTEngine, engine_for
+from ShockTubeIDT.ignition_delay import ignition_delay
+from ShockTubeIDT.mechanism_cache import MechanismCache
+
+from conftest import H2
+
+
+def test_no_deprecated_thermo_access(gas):
+    engine = engine_for(gas)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        tau = ignition_delay(gas, engine=engine)
+    assert tau > 0.0
+    assert not [w for w in caught if "ReactorBase.thermo" in str(w.message)]
+
+
+def test_engine_reused_per_solution(gas):
+    assert engine_for(gas) is engine_for(gas)
+    assert engine_for(gas, "HP") is not engine_for(gas)
+    # an engine built for another Solution is replaced, not used
+    other = ct.Solution("h2o2.yaml")
+    other.TPX = 1000.0, 101325.0, H2
+    reference = ignition_delay(other)
+    other.TPX = 1000.0, 101325.0, H2
+    assert ignition_delay(other, engine=engine_for(gas)) == reference
+
+
+def test_engines_released_with_mechanism():
+    cache = MechanismCache(maxsize=1)
+    gas = cache.get("h2o2.yaml")
+    engines = cache.engines(gas)
+    engines["UV"] = IDTEngine(gas)
+    cache.get("gri30.yaml")
+    assert cache.engines(gas) is None
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ShockTubeIDT.history import _HEADER, HistoryBuffer, HistoryWriter, read_history
+from ShockTubeIDT.ignition_delay import idt_sweep_TP, ignition_delay
+
+from conftest import H2
+
+
+def test_buffer_grows():
+    buf = HistoryBuffer(["a", "b"], capacity=2)
+    for i in range(5):
+        buf.append([i, 2 * i])
+    assert len(buf) == 5
+    assert np.array_equal(buf.column("b"), [0, 2, 4, 6, 8])
+    assert list(buf.to_dataframe(index="a").index) == [0, 1, 2, 3, 4]
+    buf.clear()
+    assert len(buf) == 0 and buf.data.shape == (0, 2)
+
+
+def test_returned_history(gas):
+    tau, df = ignition_delay(gas, history=True)
+    assert df.index.name == "time"
+    assert list(df.columns) == ["temperature", "pressure"]
+    assert df.index[0] < tau < df.index[-1]
+    assert df["temperature"].iloc[-1] > df["temperature"].iloc[0] + 500.0
+
+
+def test_writer_header_and_chunks(tmp_path, gas):
+    path = str(tmp_path / "h.npy")
+    writer = HistoryWriter(path, gas, species=["H2", "OH"], chunk=3)
+    X = gas.X
+    for i in range(7):
+        writer.append(float(i), 1000.0 + i, 1e5, X)
+    writer.close(tau=1.5)
+
+    with open(path, "rb") as f:
+        header = f.read(_HEADER)
+    assert header.startswith(b"\x93NUMPY") and header.endswith(b"\n")
+    data = np.load(path)
+    assert data.shape == (7, 5)
+    assert np.array_equal(data[:, 0], np.arange(7.0))
+    assert data[0, 3] == X[gas.species_index("H2")]
+
+    df = read_history(path, columns=["temperature"])
+    assert list(df.columns) == ["temperature"]
+    assert df.attrs["tau"] == 1.5
+
+
+def test_interval_keeps_final_state(tmp_path, gas):
+    path = str(tmp_path / "h.npy")
+    writer = HistoryWriter(path, gas, interval=1.0)
+    for t in np.linspace(0.0, 2.5, 11):
+        writer.append(t, 1000.0, 1e5, gas.X)
+    writer.close()
+    assert np.allclose(np.load(path)[:, 0], [0.0, 1.0, 2.0, 2.5])
+
+
+def test_history_file_matches_returned_history(tmp_path, gas):
+    state = gas.state
+    tau, df = ignition_delay(gas, history=True)
+    gas.state = state
+    path = str(tmp_path / "{T:.0f}.npy")
+    assert ignition_delay(gas, historyFile=path, historySpecies=[]) == tau
+    streamed = read_history(str(tmp_path / "1000.npy"))
+    assert len(streamed) == len(df) + 1
+    pd.testing.assert_series_equal(streamed["temperature"].iloc[1:], df["temperature"],
+                                   check_names=False)
+
+
+def test_sweep_writes_one_file_per_point(tmp_path, gas):
+    template = str(tmp_path / "{P:.0f}-{T:.0f}.npy")
+    taus = idt_sweep_TP(gas, [1000.0, 1100.0], [1e5, 2e5], H2, historyFile=template,
+                        historySpecies=["OH"])
+    assert len(list(tmp_path.glob("*.npy"))) == 4
+    df = read_history(str(tmp_path / "200000-1100.npy"))
+    assert list(df.columns) == ["temperature", "pressure", "OH"]
+    assert df.attrs["tau"] == taus[1, 1]
+    with pytest.raises(ValueError):
+        idt_sweep_TP(gas, [1000.0, 1100.0], [1e5], H2, historyFile=str(tmp_path / "{P}.npy"))
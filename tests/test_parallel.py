@@ -0,0 +1,66 @@
+import cantera as ct
+import numpy as np
+
+from ShockTubeIDT.engine import engine_for
+from ShockTubeIDT.ignition_delay import idt_sweep_T, ignition_delay
+from ShockTubeIDT.instrument import Profiler
+from ShockTubeIDT.mechanism_cache import get_solution
+from ShockTubeIDT.parallel import TOLERANCES, _tolerance_ladder, run_curves
+
+from conftest import H2
+
+CURVES = [("h2o2.yaml", 101325.0, H2), ("h2o2.yaml", 1e6, H2)]
+TEMPS = [1000.0, 1100.0, 1200.0]
+
+
+def reference(curves=CURVES, temps=TEMPS):
+    gas = get_solution("h2o2.yaml")
+    out = np.empty((len(curves), len(temps)))
+    for c, (mech, P, X) in enumerate(curves):
+        for q, T in enumerate(temps):
+            gas.TPX = T, P, X
+            out[c, q] = ignition_delay(gas)
+    return out
+
+
+def test_serial_and_pool_agree():
+    expected = reference()
+    assert np.array_equal(run_curves(ignition_delay, CURVES, TEMPS), expected)
+    pooled = run_curves(ignition_delay, CURVES, TEMPS, max_workers=2, chunksize=1)
+    assert np.array_equal(pooled, expected)
+
+
+def test_pool_keeps_rate_multipliers():
+    # not the cached Solution, which forked workers would inherit as is
+    gas = ct.Solution("h2o2.yaml")
+    gas.set_multiplier(5.0, 1)
+    serial = idt_sweep_T(gas, TEMPS, 101325.0, H2)
+    pooled = idt_sweep_T(gas, TEMPS, 101325.0, H2, max_workers=2)
+    assert np.array_equal(pooled, serial)
+    assert not np.array_equal(serial, reference(CURVES[:1])[0])
+
+
+def test_warm_start_and_profile():
+    profile = Profiler()
+    values = run_curves(ignition_delay, CURVES, TEMPS, warmStart=True, earlyStop=False,
+                        profile=profile)
+    assert values.shape == (2, 3)
+    assert sorted((r["curve"], r["point"]) for r in profile.records) == [
+        (c, q) for c in range(2) for q in range(3)
+    ]
+
+
+def test_warm_start_keeps_engine_tolerances():
+    gas = ct.Solution("h2o2.yaml")
+    network = engine_for(gas).network
+    network.rtol, network.atol = 1e-5, 1e-12
+    assert _tolerance_ladder(network) == [(1e-5, 1e-12)] + list(TOLERANCES)
+    curves = [(gas, 101325.0, H2)]
+    plain = run_curves(ignition_delay, curves, TEMPS)
+    # the caller's tolerances are used, not replaced by the defaults
+    assert np.array_equal(run_curves(ignition_delay, curves, TEMPS, warmStart=True), plain)
+    assert (network.rtol, network.atol) == (1e-5, 1e-12)
+    assert not np.array_equal(plain, reference(curves[:1]))
+
+    network.rtol, network.atol = 1e-11, 1e-17
+    assert _tolerance_ladder(network) == [(1e-11, 1e-17), TOLERANCES[-1]]
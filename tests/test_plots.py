@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+
+from ShockTubeIDT.cividisHexValues import cividis_map
+from ShockTubeIDT.idt_plots import comp_mech, comp_mech_data, line_colors, render_figures
+
+TEMPS = np.array([1000.0, 1100.0, 1200.0])
+# indexed (X, M, T)
+IDTS = np.array([[[1e-3, 4e-4, 2e-4], [1.2e-3, 5e-4, 2.2e-4]]] * 2)
+
+
+def _draw_line(fig, y):
+    fig.add_subplot().plot(y)
+
+
+def test_figures_are_rendered(tmp_path):
+    ofname = str(tmp_path / "idt.png")
+    rendered = comp_mech(["a", "b"], ["m1", "m2"], TEMPS, IDTS, ofname)
+    assert [os.path.basename(f) for f in rendered] == ["idt-mix0.png", "idt-mix1.png"]
+    assert all(os.path.getsize(f) > 0 for f in rendered)
+
+    lo, hi = 0.8 * IDTS[0], 1.2 * IDTS[0]
+    rendered = comp_mech_data(["a"], ["m1", "m2"], TEMPS, IDTS[:1], str(tmp_path / "d.png"),
+                              bands=(lo, hi), max_workers=2)
+    assert os.path.exists(rendered[0])
+
+
+def test_incremental_skips_unchanged(tmp_path):
+    jobs = [(str(tmp_path / f"f{k}.png"), (2.0, 2.0), _draw_line, ([0.0, k],))
+            for k in range(2)]
+    assert len(render_figures(jobs, incremental=True)) == 2
+    assert render_figures(jobs, incremental=True) == []
+
+    jobs[1] = (jobs[1][0], (2.0, 2.0), _draw_line, ([0.0, 5.0],))
+    assert render_figures(jobs, incremental=True) == [jobs[1][0]]
+    os.remove(jobs[0][0])
+    assert render_figures(jobs, incremental=True) == [jobs[0][0]]
+    # without incremental everything is drawn
+    assert len(render_figures(jobs)) == 2
+
+
+def test_line_colors():
+    colors = line_colors(5)
+    assert colors.shape == (5, 3)
+    assert not colors.flags.writeable
+    assert line_colors(5) is colors
+    assert np.array_equal(colors[0], cividis_map[0])
+    assert np.array_equal(colors[-1], cividis_map[-1])
+
+    hexes = ["#000000", "#ffffff"]
+    assert np.array_equal(line_colors(2, hexes), [[0, 0, 0], [1, 1, 1]])
+    # more lines than entries are interpolated
+    assert np.allclose(line_colors(3, hexes)[1], 0.5)
+    assert line_colors(0) is None
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from ShockTubeIDT.engine import compression_schedule, pressure_ratio
+from ShockTubeIDT.ignition_delay import ignition_delay
+
+
+def test_constant_pressure_differs(gas):
+    state = gas.state
+    uv = ignition_delay(gas)
+    gas.state = state
+    hp = ignition_delay(gas, mode="HP")
+    assert np.isfinite(hp) and hp != uv
+    gas.state = state
+    with pytest.raises(ValueError):
+        ignition_delay(gas, mode="HP", definitions=["dPdt"])
+    with pytest.raises(ValueError):
+        ignition_delay(gas, mode="UVH")
+
+
+def test_pressure_rise_shortens_ignition(gas):
+    gas.TPX = 900.0, 101325.0 * 10, "H2:0.04,O2:0.02,AR:0.94"
+    state = gas.state
+    flat = ignition_delay(gas, mode="compression", pressureRise=0.0)
+    gas.state = state
+    # without a rise the wall does not move
+    assert flat == pytest.approx(ignition_delay(gas), rel=1e-6)
+    gas.state = state
+    rising = ignition_delay(gas, mode="compression", pressureRise=200.0)
+    gas.state = state
+    assert rising < flat
+    # a tabulated profile with the same rise gives the same IDT
+    times = np.linspace(0.0, 1.0, 11)
+    tabulated = ignition_delay(gas, mode="compression",
+                               pressureProfile=(times, 1.0 + 200.0 * times))
+    assert tabulated == pytest.approx(rising, rel=1e-3)
+    gas.state = state
+    with pytest.raises(ValueError):
+        ignition_delay(gas, mode="compression")
+
+
+def test_compression_schedule_is_isentropic(gas):
+    ratio = pressure_ratio(pressureRise=100.0)
+    times, dVdt = compression_schedule(gas, ratio, 1e-2)
+    assert times[0] == 0.0 and times[-1] == pytest.approx(1e-2)
+    assert np.all(dVdt <= 0.0)
+    # the volume at the end is that of the isentropically compressed gas
+    V = 1.0 + np.sum(0.5 * (dVdt[1:] + dVdt[:-1]) * np.diff(times))
+    state = gas.state
+    v0 = gas.v
+    gas.SP = gas.s, gas.P * ratio(1e-2)
+    assert V == pytest.approx(gas.v / v0, rel=1e-3)
+    gas.state = state
+    assert np.all(compression_schedule(gas, pressure_ratio(pressureRise=0.0), 1.0)[1] == 0.0)
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from ShockTubeIDT.ignition_delay import idt_sweep_T, ignition_delay
+from ShockTubeIDT.mechanism_cache import get_solution
+from ShockTubeIDT.reduction import reduce_mechanism, skeletal_solution
+
+CH4 = "CH4:0.05,O2:0.1,AR:0.85"
+POINTS = [(1400.0, 1e6, CH4), (1600.0, 1e6, CH4)]
+
+
+@pytest.fixture(scope="module")
+def skeletal(tmp_path_factory):
+    cacheDir = str(tmp_path_factory.mktemp("mechanisms"))
+    return reduce_mechanism("gri30.yaml", POINTS, tolerance=0.05, cacheDir=cacheDir), cacheDir
+
+
+def test_skeletal_is_smaller_and_within_tolerance(skeletal):
+    reduced, _ = skeletal
+    full = get_solution("gri30.yaml")
+    assert reduced.n_species < full.n_species
+    assert {"CH4", "O2", "AR"} <= set(reduced.species_names)
+    for T, P, X in POINTS:
+        full.TPX = T, P, X
+        reduced.TPX = T, P, X
+        assert ignition_delay(reduced) == pytest.approx(ignition_delay(full), rel=0.05)
+
+
+def test_reduction_is_cached(skeletal):
+    reduced, cacheDir = skeletal
+    again = reduce_mechanism("gri30.yaml", POINTS, tolerance=0.05, cacheDir=cacheDir)
+    assert again.source == reduced.source
+
+
+def test_full_mechanism_is_untouched():
+    full = get_solution("gri30.yaml")
+    before = [dict(r.input_data) for r in full.reactions()]
+    skeletal_solution(full, [k for k in full.species_names if k not in ("N2", "AR")])
+    assert [dict(r.input_data) for r in full.reactions()] == before
+    assert full.n_species == 53
+
+
+def test_sweep_on_a_reduced_mechanism(skeletal):
+    _, cacheDir = skeletal
+    result = idt_sweep_T("gri30.yaml", [1400.0, 1600.0], 1e6, CH4, labeled=True,
+                         reduce={"tolerance": 0.05, "cacheDir": cacheDir},
+                         definitions=["dPdt", "OH"])
+    assert result.values.dtype.names == ("dPdt", "OH")
+    assert list(result.attrs["reduced"].values())[0].startswith(cacheDir)
+    assert np.all(np.isfinite(result.values["OH"]))
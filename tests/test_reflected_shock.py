@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from ShockTubeIDT.ignition_delay import idt_points
+from ShockTubeIDT.reflected_shock import FrozenThermo, reflected_shock
+
+from conftest import H2
+
+
+def test_frozen_thermo_matches_cantera(gas):
+    thermo = FrozenThermo(gas, H2)
+    T = np.array([300.0, 1000.0, 2500.0])
+    h, cp = thermo.h_cp(T)
+    state = gas.state
+    for i, Ti in enumerate(T):
+        gas.TPX = Ti, 101325.0, H2
+        assert h[i] == pytest.approx(gas.enthalpy_mass, rel=1e-9, abs=1e-3)
+        assert cp[i] == pytest.approx(gas.cp_mass, rel=1e-9)
+    gas.state = state
+
+
+def test_monatomic_gas_follows_ideal_shock_relations(gas):
+    # argon has a constant cp, so the perfect-gas relations are exact
+    T1, P1, g = 300.0, 5000.0, 5.0 / 3.0
+    thermo = FrozenThermo(gas, "AR:1")
+    Ms = np.array([2.0, 3.0])
+    u1 = Ms * np.sqrt(g * thermo.R * T1)
+    shock = reflected_shock(u1, T1, P1, "AR:1", gas)
+
+    P2 = P1 * (2 * g * Ms**2 - (g - 1)) / (g + 1)
+    T2 = T1 * (2 * g * Ms**2 - (g - 1)) * ((g - 1) * Ms**2 + 2) / ((g + 1) ** 2 * Ms**2)
+    assert np.allclose(shock.P2, P2, rtol=1e-6)
+    assert np.allclose(shock.T2, T2, rtol=1e-6)
+    # the gas behind the reflected shock is at rest:
+    # rho2 (uR + up) = rho5 uR
+    r5 = (shock.P5 / shock.T5) / (shock.P2 / shock.T2)
+    assert np.allclose(shock.uR * (r5 - 1.0), shock.up, rtol=1e-6)
+    assert np.all(shock.T5 > shock.T2)
+
+
+def test_batches_broadcast(gas):
+    u1 = np.array([[800.0, 850.0], [900.0, 950.0]])
+    shock = reflected_shock(u1, 300.0, 5000.0, H2, gas)
+    assert shock.T5.shape == (2, 2)
+    assert np.all(np.diff(shock.T5.ravel()) > 0.0)
+
+    mixed = reflected_shock([800.0, 800.0], 300.0, 5000.0, [H2, "AR:1"], gas)
+    assert mixed.T5[0] == pytest.approx(shock.T5[0, 0])
+    assert mixed.T5[1] != mixed.T5[0]
+    with pytest.raises(ValueError):
+        reflected_shock([800.0, 850.0], 300.0, 5000.0, [H2] * 3, gas)
+
+
+def test_conditions_feed_idt_points(gas):
+    shock = reflected_shock([700.0, 750.0], 300.0, 10000.0, H2, gas)
+    taus = idt_points(gas, shock.T5, shock.P5, H2)
+    assert taus.shape == (2,)
+    assert taus[1] < taus[0]
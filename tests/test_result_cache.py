@@ -0,0 +1,63 @@
+import math
+
+from ShockTubeIDT.ignition_delay import ignition_delay
+from ShockTubeIDT.instrument import Profiler
+from ShockTubeIDT.mechanism_cache import get_solution
+from ShockTubeIDT.reduction import skeletal_solution
+from ShockTubeIDT.result_cache import ResultCache, state_key
+
+from conftest import H2
+
+
+def test_state_key(gas):
+    key = state_key(gas, {"endTime": 1.0})
+    assert state_key(gas, {"endTime": 1.0}) == key
+    assert state_key(gas, {"endTime": 0.5}) != key
+    gas.TPX = 1000.0 + 1e-6, 101325.0, H2
+    assert state_key(gas, {"endTime": 1.0}) != key
+    gas.TPX = 1000.0, 101325.0, H2
+    gas.set_multiplier(2.0, 0)
+    assert state_key(gas, {"endTime": 1.0}) != key
+
+
+def test_cache_roundtrip(tmp_path):
+    cache = ResultCache(str(tmp_path / "c.sqlite"))
+    cache.put("a", float("nan"))
+    cache.put("b", {"OH": 1e-3})
+    assert math.isnan(cache.get("a"))
+    assert cache.get("b") == {"OH": 1e-3}
+    assert cache.get("c") is None
+    assert len(cache) == 2
+
+
+def test_ignition_delay_hits_cache(tmp_path, gas):
+    cache = ResultCache(str(tmp_path / "c.sqlite"))
+    profile = Profiler()
+    state = gas.state
+    tau = ignition_delay(gas, cache=cache, profile=profile)
+    gas.state = state
+    assert ignition_delay(gas, cache=cache, profile=profile) == tau
+    assert [r["cached"] for r in profile.records] == [False, True]
+
+
+def test_solutions_without_file_are_keyed_by_content(tmp_path):
+    full = get_solution("h2o2.yaml")
+    species = full.species_names
+    # both have source "custom parts"; without H2O2 there is no ignition
+    first = skeletal_solution(full, species)
+    second = skeletal_solution(full, [k for k in species if k not in ("H2O2", "HO2")])
+    same = skeletal_solution(full, species)
+    for gas in (first, second, same):
+        gas.TPX = 1000.0, 101325.0, H2
+    assert state_key(first, {}) != state_key(second, {})
+    assert state_key(first, {}) == state_key(same, {})
+
+    cache = ResultCache(str(tmp_path / "c.sqlite"))
+    taus = []
+    for gas in (first, second):
+        reference = ignition_delay(gas, endTime=0.01)
+        gas.TPX = 1000.0, 101325.0, H2
+        cached = ignition_delay(gas, endTime=0.01, cache=cache)
+        assert cached == reference or (math.isnan(cached) and math.isnan(reference))
+        taus.append(cached)
+    assert not math.isnan(taus[0]) and taus[0] != taus[1]
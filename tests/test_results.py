@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from ShockTubeIDT.ignition_delay import idt_sweep_T
+from ShockTubeIDT.results import IDTResult
+
+from conftest import H2
+
+
+@pytest.fixture
+def result():
+    values = np.arange(24.0).reshape(2, 3, 4)
+    coords = {"P": [1e5, 1e6], "X": ["a", "b", "c"], "T": [900.0, 1000.0, 1100.0, 1200.0]}
+    return IDTResult(values, "PXT", coords, attrs={"note": 1})
+
+
+def test_isel_views(result):
+    sub = result.isel(P=1, T=slice(1, 3))
+    assert sub.dims == ("X", "T")
+    assert np.array_equal(sub.values, result.values[1, :, 1:3])
+    assert np.shares_memory(sub.values, result.values)
+    assert list(sub.coords["T"]) == [1000.0, 1100.0]
+    assert sub.attrs == {"note": 1}
+
+
+def test_sel_by_label(result):
+    assert result.sel(P=1e6, X="b", T=1000.0).values == result.values[1, 1, 1]
+    sub = result.sel(X=["c", "a"])
+    assert np.array_equal(sub.values, result.values[:, [2, 0]])
+    with pytest.raises(KeyError):
+        result.sel(T=950.0)
+    with pytest.raises(KeyError):
+        result.isel(M=0)
+
+
+def test_save_load(tmp_path, result):
+    result.save(tmp_path / "r")
+    loaded = IDTResult.load(tmp_path / "r")
+    assert loaded.dims == result.dims
+    assert np.array_equal(loaded.values, result.values)
+    assert loaded.attrs == result.attrs
+    assert list(loaded.coords["X"]) == ["a", "b", "c"]
+
+
+def test_shape_checks():
+    with pytest.raises(ValueError):
+        IDTResult(np.zeros((2, 3)), "PT", {"P": [1, 2], "T": [1, 2]})
+
+
+def test_labeled_sweep(gas):
+    Trange = [1000.0, 1200.0]
+    result = idt_sweep_T(gas, Trange, 101325.0, H2, labeled=True)
+    assert result.dims == ("T",)
+    assert list(result.coords["T"]) == Trange
+    assert result.sel(T=1200.0).values < result.sel(T=1000.0).values
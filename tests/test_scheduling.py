@@ -0,0 +1,53 @@
+import numpy as np
+
+from ShockTubeIDT.ignition_delay import ignition_delay
+from ShockTubeIDT.parallel import run_curves
+from ShockTubeIDT.scheduling import CostModel, longest_first
+
+from conftest import H2
+
+
+def test_untrained_model_ranks_by_size_and_temperature():
+    model = CostModel()
+    small, large = model.predict("h2o2.yaml", [1000.0]), model.predict("gri30.yaml", [1000.0])
+    assert large > small
+    assert np.all(np.diff(model.predict("h2o2.yaml", [900.0, 1000.0, 1100.0])) < 0.0)
+
+
+def test_fit_and_save(tmp_path):
+    path = str(tmp_path / "timings.json")
+    model = CostModel(path, minSamples=3)
+    T = np.array([900.0, 1000.0, 1100.0, 1200.0])
+    seconds = 1e-6 * np.exp(8.0 * 1000.0 / T)
+    model.update("h2o2.yaml", T, seconds)
+    # non-positive or missing timings are not recorded
+    model.update("h2o2.yaml", [1000.0, 1000.0], [0.0, np.nan])
+    assert np.allclose(model.predict("h2o2.yaml", [950.0]), 1e-6 * np.exp(8.0 / 0.95))
+    model.save()
+
+    loaded = CostModel(path, minSamples=3, keep=2)
+    assert np.allclose(loaded.predict("h2o2.yaml", T), seconds)
+    # other mechanisms borrow the fit, scaled by their size
+    assert loaded.predict("gri30.yaml", [1000.0]) > loaded.predict("h2o2.yaml", [1000.0])
+    loaded.update("h2o2.yaml", [1000.0], [1.0])
+    assert len(next(iter(loaded.timings.values()))["samples"]) == 2
+
+
+def test_longest_first():
+    model = CostModel()
+    curves = [("h2o2.yaml", 1e5, H2), ("gri30.yaml", 1e5, H2)]
+    Tgrid = np.array([[900.0, 1200.0], [900.0, 1200.0]])
+    todo = [np.array([0, 1]), np.array([1])]
+    assert longest_first(model, curves, Tgrid, todo) == [(1, 1), (0, 0), (0, 1)]
+    assert longest_first(model, curves, Tgrid, [np.array([], dtype=int)] * 2) == []
+
+
+def test_scheduled_sweep_keeps_order(tmp_path):
+    curves = [("h2o2.yaml", 101325.0, H2), ("h2o2.yaml", 1e6, H2)]
+    temps = [1000.0, 1100.0, 1200.0]
+    expected = run_curves(ignition_delay, curves, temps)
+    model = CostModel(str(tmp_path / "timings.json"))
+    assert np.array_equal(run_curves(ignition_delay, curves, temps, max_workers=2,
+                                     schedule=model), expected)
+    assert (tmp_path / "timings.json").exists()
+    assert len(CostModel(str(tmp_path / "timings.json")).timings) == 1
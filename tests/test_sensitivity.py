@@ -0,0 +1,43 @@
+import cantera as ct
+import numpy as np
+import pytest
+
+from ShockTubeIDT.sensitivity import idt_sensitivity, screen_reactions
+
+from conftest import H2
+
+
+def test_chain_branching_ranks_first(gas):
+    state = gas.state
+    table = idt_sensitivity(gas)
+    assert table["equation"][0] == "H + O2 <=> O + OH"
+    assert table["sensitivity"][0] < 0.0
+    assert table["tau"][0] < table.attrs["tau0"]
+    # the gas is left as it was
+    assert np.array_equal(gas.state, state)
+    assert gas.multiplier(int(table["reaction"][0])) == 1.0
+
+
+def test_screening_keeps_the_top_reactions(gas):
+    full = idt_sensitivity(gas)
+    screened = idt_sensitivity(gas, top=5)
+    assert len(screened) <= 5
+    assert screened["reaction"][0] == full["reaction"][0]
+    assert len(screen_reactions(gas, full.attrs["tau0"], 5)) == 5
+
+
+def test_serial_and_pool_agree():
+    # a Solution of its own, so the changed rate does not leak into other tests
+    gas = ct.Solution("h2o2.yaml")
+    gas.TPX = 1000.0, 101325.0, H2
+    gas.set_multiplier(2.0, 0)
+    serial = idt_sensitivity(gas, reactions=range(6))
+    pooled = idt_sensitivity(gas, reactions=range(6), max_workers=2)
+    assert np.allclose(serial["sensitivity"], pooled["sensitivity"], rtol=1e-6, atol=1e-9)
+
+
+def test_definitions_are_rejected(gas):
+    with pytest.raises(ValueError, match="signal"):
+        idt_sensitivity(gas, definitions=["dPdt", "OH"])
+    table = idt_sensitivity(gas, reactions=[1, 2], signal="OH")
+    assert np.all(np.isfinite(table["sensitivity"]))
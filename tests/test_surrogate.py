@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from ShockTubeIDT.ignition_delay import ignition_delay, idt_sweep_TPX
+from ShockTubeIDT.surrogate import IDTSurrogate
+
+from conftest import H2
+
+TRANGE = np.array([900.0, 1000.0, 1100.0, 1200.0])
+PRANGE = np.array([1e5, 1e6])
+
+
+def arrhenius(T, P, phi):
+    return 1e-9 * np.exp(15000.0 / T) * (P / 1e5) ** -0.8 * (1.0 + phi)
+
+
+def test_arrhenius_table_is_exact():
+    params = np.array([0.5, 1.0, 2.0])
+    T, P, phi = np.meshgrid(TRANGE, PRANGE, params, indexing="ij")
+    table = arrhenius(T, P, phi).transpose(2, 1, 0)
+    surrogate = IDTSurrogate(table, TRANGE, PRANGE, ["a", "b", "c"], params=params)
+    assert surrogate.cv_error["rms"] < 0.05
+    # piecewise Arrhenius: exact on the grid and along 1000/T and ln(P)
+    assert surrogate(1000.0, 1e6, 1.0) == pytest.approx(arrhenius(1000.0, 1e6, 1.0))
+    T = 1000.0 / np.linspace(1000.0 / 1200.0, 1000.0 / 900.0, 7)
+    assert np.allclose(surrogate(T, 3e5, 2.0), arrhenius(T, 3e5, 2.0))
+    # outside the sweep box and without a gas, no value
+    assert np.isnan(surrogate(1500.0, 1e6, 1.0))
+    with pytest.raises(ValueError):
+        IDTSurrogate(table[:, :, :2], TRANGE, PRANGE, ["a", "b", "c"], params=params)
+
+
+def test_queries_outside_the_sweep_are_integrated(gas):
+    state = gas.state
+    taus = idt_sweep_TPX(gas, TRANGE, PRANGE, [H2])
+    surrogate = IDTSurrogate(taus, TRANGE, PRANGE, [H2], gas=gas)
+    assert surrogate(1000.0, 1e5) == pytest.approx(taus[0, 0, 1])
+    # piecewise Arrhenius between sweep temperatures
+    inside = surrogate(1150.0, 1e5, fallback=False)
+    gas.TPX = 1150.0, 1e5, H2
+    assert inside == pytest.approx(ignition_delay(gas), rel=0.1)
+
+    gas.TPX = 1300.0, 1e5, H2
+    direct = ignition_delay(gas)
+    gas.state = state
+    assert surrogate(1300.0, 1e5) == direct
+    assert np.array_equal(gas.state, state)
@@ -0,0 +1,50 @@
+import cantera as ct
+import numpy as np
+import pytest
+
+from ShockTubeIDT.uncertainty import idt_uncertainty, stack_bands, uncertainty_sigmas
+
+from conftest import H2
+
+TRANGE = [1000.0, 1200.0]
+
+
+def test_sigmas(gas):
+    sigmas = uncertainty_sigmas(gas, {2: 3.0})
+    assert sigmas[2] == pytest.approx(np.log(3.0) / 2.0)
+    assert np.count_nonzero(sigmas) == 1
+    assert np.all(uncertainty_sigmas(gas, 2.0) == np.log(2.0) / 2.0)
+
+
+def test_bands_are_ordered(gas):
+    state = gas.state
+    result = idt_uncertainty(gas, TRANGE, 101325.0, H2, nSamples=12, seed=1)
+    assert result.samples.shape == (12, 2)
+    assert np.all(result.bands[0] < result.bands[1])
+    assert np.all(result.bands[1] < result.bands[2])
+    assert np.all(result.ignited == 1.0)
+    assert np.array_equal(gas.state, state)
+    assert gas.multiplier(0) == 1.0
+
+
+def test_serial_and_pool_agree():
+    # a Solution of its own, so the changed rate does not leak into other tests
+    gas = ct.Solution("h2o2.yaml")
+    gas.set_multiplier(2.0, 1)
+    args = (gas, TRANGE, 101325.0, H2)
+    serial = idt_uncertainty(*args, nSamples=6, factors={1: 2.0, 2: 1.5})
+    pooled = idt_uncertainty(*args, nSamples=6, factors={1: 2.0, 2: 1.5}, max_workers=2)
+    assert np.allclose(serial.samples, pooled.samples, rtol=1e-6)
+
+
+def test_stack_bands(gas):
+    result = idt_uncertainty(gas, TRANGE, 101325.0, H2, nSamples=4)
+    lo, hi = stack_bands([[result, result]] * 3)
+    assert lo.shape == hi.shape == (3, 2, 2)
+    assert np.all(lo <= hi)
+    assert stack_bands(result)[0].shape == (1, 1, 2)
+
+
+def test_definitions_are_rejected(gas):
+    with pytest.raises(ValueError, match="signal"):
+        idt_uncertainty(gas, TRANGE, 101325.0, H2, nSamples=2, definitions=["dPdt", "OH"])